@@ -6,7 +6,10 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from contextlib import asynccontextmanager
+import atexit
 import logging
+import logging.handlers
+import queue
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import aiohttp
@@ -27,6 +30,16 @@ from .services.redis_queue.redis_queue import redis_queue
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# 日志经队列交给后台线程输出，事件循环上的调用只做入队
+_root_logger = logging.getLogger()
+if not any(isinstance(h, logging.handlers.QueueHandler) for h in _root_logger.handlers):
+    _log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(_log_queue, *_root_logger.handlers, respect_handler_level=True)
+    _root_logger.handlers = [logging.handlers.QueueHandler(_log_queue)]
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
 async def check_and_setup_api_key():
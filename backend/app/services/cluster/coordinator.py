@@ -20,10 +20,18 @@ from enum import Enum
 import redis.asyncio as redis
 from collections import defaultdict, deque
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .service_registry import ServiceRegistry, ServiceType, ServiceStatus, get_service_registry
 
 logger = logging.getLogger("diagnosis-coordinator")
 
+# Worker负载报告解析优先使用 orjson（可选依赖，未安装时回退标准库）
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 class TaskPriority(Enum):
     """任务优先级"""
     LOW = 1
@@ -181,6 +189,9 @@ class DiagnosisCoordinator:
         self.is_running = False
         self.coordination_tasks = []
         
+        # 消费者连续失败达到该次数的Worker暂时移出分配轮转
+        self.max_consecutive_failures = 5
+        
         # 性能统计
         self.stats = {
             "tasks_assigned": 0,
@@ -391,8 +402,9 @@ class DiagnosisCoordinator:
                     load_data = await self.redis.hget(self.worker_loads_key, service.service_id)
                     
                     if load_data:
-                        load_info = json.loads(load_data)
-                        if current_time - load_info["last_updated"] < 60:
+                        load_info = _json_loads(load_data)
+                        if (current_time - load_info["last_updated"] < 60 and
+                                load_info.get("consecutive_failures", 0) < self.max_consecutive_failures):
                             worker_load = WorkerLoad(
                                 worker_id=service.service_id,
                                 service_name=service.service_name,
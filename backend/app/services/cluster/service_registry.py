@@ -9,18 +9,110 @@ VTOX 分布式微服务集群 - 服务注册发现机制
 """
 
 import asyncio
+import base64
+import concurrent.futures
 import json
 import logging
+import os
 import time
 import uuid
+import zlib
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 import redis.asyncio as redis
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger("service-registry")
 
+# 读路径优先使用 orjson 解析（可选依赖，未安装时回退标准库）
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# metadata 序列化后超过该长度时压缩存储（zlib + base64，兼容 decode_responses=True 的客户端）
+METADATA_COMPRESS_THRESHOLD = 512
+
+
+def _compress_metadata(service_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """metadata 过大时替换为压缩字段 metadata_z，其余字段保持明文以便服务端脚本和过滤使用"""
+    metadata_json = json.dumps(service_dict["metadata"])
+    if len(metadata_json) > METADATA_COMPRESS_THRESHOLD:
+        compressed = zlib.compress(metadata_json.encode("utf-8"), 1)
+        service_dict["metadata"] = {}
+        service_dict["metadata_z"] = base64.b64encode(compressed).decode("ascii")
+    return service_dict
+
+
+def _decompress_metadata(service_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """还原 metadata_z 压缩字段"""
+    compressed = service_dict.pop("metadata_z", None)
+    if compressed:
+        service_dict["metadata"] = json.loads(zlib.decompress(base64.b64decode(compressed)))
+    return service_dict
+
+# 健康巡检主节点锁：仅当锁值仍属于本实例时续期/释放
+_RENEW_LEADER_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_LEADER_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# 工作节点上报服务信息：仅当服务仍在注册表中时写入，并保留已存储的 status（状态只由注册表变更）
+# ARGV[2]/ARGV[3] 为序列化结果中 status 值前后的两段，ARGV[4] 为负载（空串表示不更新负载有序集合）
+_UPDATE_SERVICE_INFO_LUA = """
+local raw = redis.call('HGET', KEYS[1], ARGV[1])
+if not raw then
+    return 0
+end
+local status = cjson.decode(raw)['status']
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2] .. cjson.encode(status) .. ARGV[3])
+if ARGV[4] ~= '' then
+    for i = 2, #KEYS do
+        redis.call('ZADD', KEYS[i], ARGV[4], ARGV[1])
+    end
+end
+return 1
+"""
+
+# 服务统计：在Redis端遍历服务哈希并按类型/状态计数，只返回计数结果
+_SERVICE_STATS_LUA = """
+local stats = {
+    total_services = 0,
+    services_by_type = {},
+    services_by_status = {},
+    healthy_services = 0,
+    unhealthy_services = 0
+}
+for _, raw in ipairs(redis.call('HVALS', KEYS[1])) do
+    local ok, service = pcall(cjson.decode, raw)
+    if ok and type(service) == 'table' then
+        local service_type = tostring(service['service_type'])
+        local status = tostring(service['status'])
+        stats.total_services = stats.total_services + 1
+        stats.services_by_type[service_type] = (stats.services_by_type[service_type] or 0) + 1
+        stats.services_by_status[status] = (stats.services_by_status[status] or 0) + 1
+        if status == 'healthy' then
+            stats.healthy_services = stats.healthy_services + 1
+        else
+            stats.unhealthy_services = stats.unhealthy_services + 1
+        end
+    end
+end
+return cjson.encode(stats)
+"""
+
 class ServiceType(Enum):
     """服务类型枚举"""
     API_GATEWAY = "api_gateway"
@@ -36,7 +128,7 @@ class ServiceStatus(Enum):
     UNHEALTHY = "unhealthy"
     SHUTDOWN = "shutdown"
 
-@dataclass
+@dataclass(slots=True)
 class ServiceInfo:
     """服务信息数据类"""
     service_id: str
@@ -50,20 +142,39 @@ class ServiceInfo:
     last_heartbeat: float
     registered_at: float
     version: str = "1.0.0"
+    # 序列化结果缓存，修改任一字段后需调用 invalidate_cache()
+    _cached_json: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
         return {
-            **asdict(self),
+            "service_id": self.service_id,
             "service_type": self.service_type.value,
+            "service_name": self.service_name,
+            "host": self.host,
+            "port": self.port,
             "status": self.status.value,
+            "capabilities": list(self.capabilities),
+            "metadata": dict(self.metadata),
             "last_heartbeat": self.last_heartbeat,
-            "registered_at": self.registered_at
+            "registered_at": self.registered_at,
+            "version": self.version
         }
     
+    def serialized(self) -> str:
+        """返回JSON序列化结果（带缓存）"""
+        if self._cached_json is None:
+            self._cached_json = json.dumps(_compress_metadata(self.to_dict()))
+        return self._cached_json
+    
+    def invalidate_cache(self):
+        """修改字段（含原地修改 metadata/capabilities）后需手动使缓存失效"""
+        self._cached_json = None
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ServiceInfo':
         """从字典创建实例"""
+        data = _decompress_metadata(data)
         return cls(
             service_id=data["service_id"],
             service_type=ServiceType(data["service_type"]),
@@ -84,15 +195,44 @@ class ServiceRegistry:
     基于Redis实现，无需外部依赖
     """
     
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: redis.Redis, configure_keyspace_events: bool = False):
         self.redis = redis_client
+        # 是否允许注册表自行 CONFIG SET 开启键过期通知；Redis可能与其他应用共享，默认只检查不修改，
+        # 部署时应在 Redis 配置中设置 notify-keyspace-events Ex
+        self.configure_keyspace_events = configure_keyspace_events
         self.services_key = "vtox:services"
-        self.heartbeat_key = "vtox:heartbeats"
-        self.events_key = "vtox:service_events"
+        self.heartbeat_key_prefix = "vtox:hb:"  # 每个服务一个带TTL的心跳键
+        # 事件流(Redis Stream)；旧版本的 vtox:service_events 为List类型，换用新键避免类型冲突
+        self.events_key = "vtox:service_event_stream"
+        self.events_maxlen = 1000  # 保留最近约1000个事件
+        self.index_key_prefix = "vtox:idx:"  # 按类型/能力/状态的服务ID二级索引(Set)
+        self.load_key_prefix = "vtox:load:"  # 按能力的服务负载排序(ZSet)
+        self.load_lookup_window = 8  # 按负载选择服务时每次读取的候选数（全部不健康时翻倍扩大）
         
         # 服务健康检查配置
         self.heartbeat_interval = 5   # 心跳间隔(秒) - 减少到5秒
-        self.health_timeout = 20      # 健康超时(秒) - 减少到20秒
+        self.health_timeout = 20      # 健康超时(秒) - 减少到20秒，同时作为心跳键TTL
+        self.health_sweep_interval = 60  # 兜底巡检间隔(秒)，主要依赖键过期通知
+        
+        # 健康巡检主节点选举：多进程共享同一Redis时仅主节点执行巡检和过期处理
+        self.health_leader_key = "vtox:health_leader"
+        # 主节点锁续期间隔(秒)；锁TTL为其3倍，主节点崩溃后其他节点在数秒内接管过期事件处理
+        self.health_leader_renew_interval = 5
+        self._instance_id = uuid.uuid4().hex
+        self._is_health_leader = False
+        
+        # 小命令合批：同进程内多个客户端的心跳等命令合并为一次管道写入
+        self.batch_max_commands = 32     # 累积命令数达到该值立即发送
+        self.batch_flush_delay = 0.001   # 最长等待时间(秒)
+        self._batch_pipe = None
+        self._batch_waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._batch_flush_handle = None
+        # 定时触发的发送任务（保持引用防止被回收）
+        self._batch_flush_tasks: set = set()
+        
+        # 服务统计脚本（首次调用时 EVALSHA，缺失时自动回退 EVAL）
+        self._stats_script = self.redis.register_script(_SERVICE_STATS_LUA)
+        self._update_info_script = self.redis.register_script(_UPDATE_SERVICE_INFO_LUA)
         
         # 事件回调
         self.event_callbacks: Dict[str, List[Callable]] = {
@@ -104,7 +244,20 @@ class ServiceRegistry:
         
         # 健康检查任务
         self._health_check_task = None
+        self._expiry_listener_task = None
         self._running = False
+        
+        # 待写入事件流的事件，由后台任务按批发送
+        self.event_batch_size = 32        # 累积事件数达到该值立即发送
+        self.event_flush_interval = 0.005  # 最长等待时间(秒)
+        self._pending_events: List[Dict[str, str]] = []
+        self._event_drain_task = None
+        
+        # 后台执行中的事件回调任务（保持引用防止被回收）
+        self._callback_tasks: set = set()
+        # 回调并发上限；同步回调放入线程池，避免阻塞事件循环
+        self._callback_semaphore = asyncio.Semaphore(64)
+        self._callback_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
     
     async def register_service(self, service_info: ServiceInfo) -> bool:
         """注册服务"""
@@ -112,20 +265,30 @@ class ServiceRegistry:
             service_info.registered_at = time.time()
             service_info.last_heartbeat = time.time()
             service_info.status = ServiceStatus.HEALTHY
+            service_info.invalidate_cache()
             
-            # 存储服务信息
-            await self.redis.hset(
+            service_dict = service_info.to_dict()
+            service_json = service_info.serialized()
+            
+            # 存储服务信息并发布注册事件（单次往返）
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(
                 self.services_key,
                 service_info.service_id,
-                json.dumps(service_info.to_dict())
+                service_json
             )
+            self._queue_index_add(pipe, service_info)
+            await pipe.execute()
             
-            # 发布服务注册事件
-            await self._publish_event("service_registered", service_info.to_dict())
+            self._enqueue_event("service_registered", service_json)
+            self._fire_event_callbacks("service_registered", service_dict)
             
-            logger.info(f"✅ 服务注册成功: {service_info.service_name}({service_info.service_id})")
-            logger.info(f"   📍 地址: {service_info.host}:{service_info.port}")
-            logger.info(f"   🛠️ 能力: {service_info.capabilities}")
+            # 单条日志 + %-风格参数：日志级别关闭时不做格式化
+            logger.info(
+                "✅ 服务注册成功: %s(%s) 📍 地址: %s:%s 🛠️ 能力: %s",
+                service_info.service_name, service_info.service_id,
+                service_info.host, service_info.port, service_info.capabilities
+            )
             
             return True
             
@@ -142,51 +305,74 @@ class ServiceRegistry:
                 logger.warning(f"⚠️ 尝试注销不存在的服务: {service_id}")
                 return False
             
-            service_info = ServiceInfo.from_dict(json.loads(service_data))
+            service_info = ServiceInfo.from_dict(_json_loads(service_data))
             service_info.status = ServiceStatus.SHUTDOWN
+            service_info.invalidate_cache()
+            
+            service_dict = service_info.to_dict()
             
-            # 删除服务
-            await self.redis.hdel(self.services_key, service_id)
-            await self.redis.hdel(self.heartbeat_key, service_id)
+            # 删除服务并发布注销事件（单次往返）
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hdel(self.services_key, service_id)
+            pipe.delete(self._heartbeat_key(service_id))
+            self._queue_index_remove(pipe, service_info)
+            await pipe.execute()
             
-            # 发布服务注销事件
-            await self._publish_event("service_deregistered", service_info.to_dict())
+            self._enqueue_event("service_deregistered", service_info.serialized())
+            self._fire_event_callbacks("service_deregistered", service_dict)
             
-            logger.info(f"✅ 服务注销成功: {service_info.service_name}({service_id})")
+            logger.info("✅ 服务注销成功: %s(%s)", service_info.service_name, service_id)
             return True
             
         except Exception as e:
             logger.error(f"❌ 服务注销失败: {e}")
             return False
     
+    async def touch_heartbeat(self, service_id: str) -> bool:
+        """快速心跳：只刷新心跳键，不读取/恢复服务状态"""
+        try:
+            await self._exec_batched([
+                ("set", (self._heartbeat_key(service_id), str(time.time())), {"ex": self.health_timeout})
+            ])
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ 心跳发送失败: {e}")
+            return False
+    
     async def heartbeat(self, service_id: str) -> bool:
-        """发送心跳"""
+        """发送心跳（完整版：同时检查并恢复服务健康状态）"""
         try:
             current_time = time.time()
             
-            # 更新心跳时间
-            await self.redis.hset(
-                self.heartbeat_key,
-                service_id,
-                str(current_time)
-            )
+            # 更新心跳时间并读取服务状态（与其他心跳合批发送）
+            _, service_data = await self._exec_batched([
+                ("set", (self._heartbeat_key(service_id), str(current_time)), {"ex": self.health_timeout}),
+                ("hget", (self.services_key, service_id), {})
+            ])
             
             # 更新服务状态为健康
-            service_data = await self.redis.hget(self.services_key, service_id)
             if service_data:
-                service_info = ServiceInfo.from_dict(json.loads(service_data))
+                service_info = ServiceInfo.from_dict(_json_loads(service_data))
                 if service_info.status != ServiceStatus.HEALTHY:
                     service_info.status = ServiceStatus.HEALTHY
                     service_info.last_heartbeat = current_time
+                    service_info.invalidate_cache()
+                    service_dict = service_info.to_dict()
+                    service_json = service_info.serialized()
                     
-                    await self.redis.hset(
+                    pipe = self.redis.pipeline(transaction=False)
+                    pipe.hset(
                         self.services_key,
                         service_id,
-                        json.dumps(service_info.to_dict())
+                        service_json
                     )
+                    self._queue_status_index(pipe, service_id, ServiceStatus.HEALTHY)
+                    await pipe.execute()
                     
-                    await self._publish_event("service_healthy", service_info.to_dict())
-                    logger.info(f"💚 服务恢复健康: {service_info.service_name}")
+                    self._enqueue_event("service_healthy", service_json)
+                    self._fire_event_callbacks("service_healthy", service_dict)
+                    logger.info("💚 服务恢复健康: %s", service_info.service_name)
             
             return True
             
@@ -199,25 +385,50 @@ class ServiceRegistry:
                           status: Optional[ServiceStatus] = None) -> List[ServiceInfo]:
         """获取服务列表"""
         try:
-            all_services = await self.redis.hgetall(self.services_key)
+            if service_type is None and status is None and not capabilities:
+                entries = (await self.redis.hgetall(self.services_key)).items()
+            else:
+                # 通过二级索引只取匹配的服务ID：类型/状态取交集，能力取并集
+                pipe = self.redis.pipeline(transaction=False)
+                exact_keys = []
+                if service_type:
+                    exact_keys.append(self._index_key("type", service_type.value))
+                if status:
+                    exact_keys.append(self._index_key("status", status.value))
+                if exact_keys:
+                    pipe.sinter(*exact_keys)
+                if capabilities:
+                    pipe.sunion(*[self._index_key("cap", cap) for cap in capabilities])
+                id_sets = await pipe.execute()
+                
+                service_ids = list(set.intersection(*(set(ids) for ids in id_sets)))
+                if not service_ids:
+                    return []
+                
+                raw_services = await self.redis.hmget(self.services_key, service_ids)
+                entries = [(sid, data) for sid, data in zip(service_ids, raw_services) if data]
+            
             services = []
             
-            for service_id, service_data in all_services.items():
+            # 过滤条件预先计算一次，直接比较原始字段，过滤掉的条目不构造 ServiceInfo
+            wanted_type = service_type.value if service_type else None
+            wanted_status = status.value if status else None
+            wanted_caps = frozenset(capabilities) if capabilities else None
+            
+            for service_id, service_data in entries:
                 try:
-                    service_info = ServiceInfo.from_dict(json.loads(service_data))
+                    data = _json_loads(service_data)
                     
-                    # 过滤条件
-                    if service_type and service_info.service_type != service_type:
+                    if wanted_type and data["service_type"] != wanted_type:
                         continue
                     
-                    if status and service_info.status != status:
+                    if wanted_status and data["status"] != wanted_status:
                         continue
                     
-                    if capabilities:
-                        if not any(cap in service_info.capabilities for cap in capabilities):
-                            continue
+                    if wanted_caps and wanted_caps.isdisjoint(data["capabilities"]):
+                        continue
                     
-                    services.append(service_info)
+                    services.append(ServiceInfo.from_dict(data))
                     
                 except Exception as e:
                     logger.warning(f"⚠️ 解析服务信息失败: {service_id} - {e}")
@@ -234,7 +445,7 @@ class ServiceRegistry:
         try:
             service_data = await self.redis.hget(self.services_key, service_id)
             if service_data:
-                return ServiceInfo.from_dict(json.loads(service_data))
+                return ServiceInfo.from_dict(_json_loads(service_data))
             return None
             
         except Exception as e:
@@ -244,6 +455,39 @@ class ServiceRegistry:
     async def find_service_for_capability(self, capability: str,
                                         prefer_healthy: bool = True) -> Optional[ServiceInfo]:
         """根据能力查找合适的服务"""
+        try:
+            # 负载有序集合按负载升序分页取候选（窗口逐步扩大），首个健康的服务即为负载最低的健康服务
+            load_key = self._load_key(capability)
+            healthy_key = self._index_key("status", ServiceStatus.HEALTHY.value)
+            service_id = None
+            least_loaded_id = None
+            start, window = 0, self.load_lookup_window
+            while True:
+                ranked_ids = await self.redis.zrange(load_key, start, start + window - 1)
+                if not ranked_ids:
+                    break
+                if least_loaded_id is None:
+                    least_loaded_id = ranked_ids[0]
+                    if not prefer_healthy:
+                        service_id = least_loaded_id
+                        break
+                
+                healthy_flags = await self.redis.smismember(healthy_key, ranked_ids)
+                service_id = next((sid for sid, ok in zip(ranked_ids, healthy_flags) if ok), None)
+                if service_id is not None or len(ranked_ids) < window:
+                    break
+                start += window
+                window *= 2
+            
+            # 没有健康的服务时退而选择负载最低的服务
+            service_id = service_id or least_loaded_id
+            if service_id:
+                service = await self.get_service(service_id)
+                if service:
+                    return service
+        except Exception as e:
+            logger.warning(f"⚠️ 负载索引查询失败，回退到全量查找: {e}")
+        
         services = await self.get_services(
             capabilities=[capability],
             status=ServiceStatus.HEALTHY if prefer_healthy else None
@@ -266,110 +510,468 @@ class ServiceRegistry:
             return
         
         self._running = True
+        await self._enable_expiry_notifications()
+        await self._backfill_indexes()
+        self._expiry_listener_task = asyncio.create_task(self._expiry_listener_loop())
         self._health_check_task = asyncio.create_task(self._health_check_loop())
         logger.info("💓 启动服务健康监控")
     
     async def stop_health_monitoring(self):
         """停止健康监控"""
         self._running = False
-        if self._health_check_task:
-            self._health_check_task.cancel()
+        for task in (self._expiry_listener_task, self._health_check_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        await self._release_health_leader()
+        # 取消待触发的定时发送并立即发送已累积的命令，避免等待方永久挂起
+        await self._flush_batch()
+        if self._batch_flush_tasks:
+            await asyncio.gather(*self._batch_flush_tasks, return_exceptions=True)
+        await self._drain_events()
+        if self._callback_tasks:
+            await asyncio.gather(*self._callback_tasks, return_exceptions=True)
+        if self._callback_pool:
+            self._callback_pool.shutdown(wait=False)
+            self._callback_pool = None
+        logger.info("🛑 停止服务健康监控")
+    
+    async def _exec_batched(self, commands: List[Tuple[str, tuple, Dict[str, Any]]]) -> List[Any]:
+        """
+        将命令追加到共享管道，累积满 batch_max_commands 条或等待 batch_flush_delay 后统一发送
+        
+        commands: [(命令名, 位置参数, 关键字参数), ...]，返回本批命令各自的结果
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        # 追加命令期间没有 await，在事件循环内天然原子，无需加锁
+        if self._batch_pipe is None:
+            self._batch_pipe = self.redis.pipeline(transaction=False)
+        
+        start = len(self._batch_pipe)
+        for name, args, kwargs in commands:
+            getattr(self._batch_pipe, name)(*args, **kwargs)
+        self._batch_waiters.append((start, len(commands), future))
+        
+        if len(self._batch_pipe) >= self.batch_max_commands:
+            await self._flush_batch()
+        elif self._batch_flush_handle is None:
+            self._batch_flush_handle = loop.call_later(
+                self.batch_flush_delay, self._schedule_batch_flush
+            )
+        
+        results = await future
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+    
+    def _schedule_batch_flush(self):
+        """call_later 回调：创建发送任务并保持引用直到完成"""
+        task = asyncio.create_task(self._flush_batch())
+        self._batch_flush_tasks.add(task)
+        task.add_done_callback(self._on_batch_flush_done)
+    
+    def _on_batch_flush_done(self, task: asyncio.Task):
+        """发送任务完成：释放引用，记录意外异常（命令错误已分发给各等待方）"""
+        self._batch_flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"❌ 合批发送失败: {task.exception()}")
+    
+    async def _flush_batch(self):
+        """发送当前累积的管道命令并分发结果"""
+        if self._batch_flush_handle is not None:
+            self._batch_flush_handle.cancel()
+            self._batch_flush_handle = None
+        
+        # 先取出当前管道（之后的命令进入新管道），等待Redis往返期间不阻塞其他调用方
+        pipe, waiters = self._batch_pipe, self._batch_waiters
+        self._batch_pipe = None
+        self._batch_waiters = []
+        if pipe is None or not waiters:
+            return
+        
+        try:
+            results = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            for _, _, future in waiters:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for start, count, future in waiters:
+            if not future.done():
+                future.set_result(results[start:start + count])
+    
+    def _heartbeat_key(self, service_id: str) -> str:
+        """服务心跳键名"""
+        return f"{self.heartbeat_key_prefix}{service_id}"
+    
+    def _index_key(self, kind: str, value: str) -> str:
+        """二级索引键名，kind 为 type/cap/status"""
+        return f"{self.index_key_prefix}{kind}:{value}"
+    
+    def _load_key(self, capability: str) -> str:
+        """能力负载有序集合键名"""
+        return f"{self.load_key_prefix}{capability}"
+    
+    def _queue_index_add(self, pipe, service_info: ServiceInfo):
+        """将服务加入类型/能力/状态索引及负载有序集合"""
+        service_id = service_info.service_id
+        current_load = service_info.metadata.get("current_load", 0)
+        pipe.sadd(self._index_key("type", service_info.service_type.value), service_id)
+        for cap in service_info.capabilities:
+            pipe.sadd(self._index_key("cap", cap), service_id)
+            pipe.zadd(self._load_key(cap), {service_id: current_load})
+        self._queue_status_index(pipe, service_id, service_info.status)
+    
+    def _queue_index_remove(self, pipe, service_info: ServiceInfo):
+        """将服务从所有索引中移除"""
+        service_id = service_info.service_id
+        pipe.srem(self._index_key("type", service_info.service_type.value), service_id)
+        for cap in service_info.capabilities:
+            pipe.srem(self._index_key("cap", cap), service_id)
+            pipe.zrem(self._load_key(cap), service_id)
+        for status in ServiceStatus:
+            pipe.srem(self._index_key("status", status.value), service_id)
+    
+    def _queue_status_index(self, pipe, service_id: str, status: ServiceStatus):
+        """状态迁移：从其他状态索引移出并加入新状态索引"""
+        for other in ServiceStatus:
+            if other != status:
+                pipe.srem(self._index_key("status", other.value), service_id)
+        pipe.sadd(self._index_key("status", status.value), service_id)
+    
+    async def _backfill_indexes(self):
+        """
+        由服务哈希补建二级索引和负载有序集合（幂等）
+        
+        索引引入前注册、且此后不再重新注册的服务不在任何索引中，按类型/能力/状态查询时会被漏掉
+        """
+        try:
+            all_services = await self.redis.hgetall(self.services_key)
+            if not all_services:
+                return
+            
+            pipe = self.redis.pipeline(transaction=False)
+            for service_id, service_data in all_services.items():
+                try:
+                    service_info = ServiceInfo.from_dict(_json_loads(service_data))
+                except Exception as e:
+                    logger.warning(f"⚠️ 补建索引时解析服务信息失败: {service_id} - {e}")
+                    continue
+                
+                pipe.sadd(self._index_key("type", service_info.service_type.value), service_id)
+                for cap in service_info.capabilities:
+                    pipe.sadd(self._index_key("cap", cap), service_id)
+                    # nx：不覆盖已上报的负载
+                    pipe.zadd(self._load_key(cap),
+                              {service_id: service_info.metadata.get("current_load", 0)}, nx=True)
+                self._queue_status_index(pipe, service_id, service_info.status)
+            await pipe.execute()
+            logger.info(f"🗂️ 已校验 {len(all_services)} 个服务的二级索引")
+        except Exception as e:
+            logger.warning(f"⚠️ 补建服务索引失败，按类型/能力/状态查询可能遗漏旧服务: {e}")
+    
+    def queue_service_info(self, pipe, service_info: ServiceInfo):
+        """
+        将工作节点上报的服务信息写入排入调用方管道（不执行），供调用方与其他写入合并为一次往返
+        status 及状态索引只由注册表维护：写入时保留已存储的状态；服务已注销时不写入
+        """
+        service_json = service_info.serialized()
+        # status 位于 metadata 等任意内容之前，首个匹配即为顶层字段
+        head, sep, tail = service_json.partition('"status": ')
+        status_json = json.dumps(service_info.status.value)
+        
+        # 元数据中的负载同步到各能力的负载有序集合，保证按负载选择服务时数据是新的
+        current_load = service_info.metadata.get("current_load")
+        load_keys = [self._load_key(cap) for cap in service_info.capabilities] if current_load is not None else []
+        keys = [self.services_key, *load_keys]
+        # 与 Script.__call__ 对管道的处理一致：登记脚本，执行前由管道确保脚本已加载
+        pipe.scripts.add(self._update_info_script)
+        pipe.evalsha(
+            self._update_info_script.sha, len(keys), *keys,
+            service_info.service_id,
+            head + sep,
+            tail[len(status_json):],
+            "" if current_load is None else current_load
+        )
+    
+    async def _enable_expiry_notifications(self):
+        """
+        检查键过期事件通知是否开启；仅当 configure_keyspace_events 为真时才 CONFIG SET 修改
+        （托管Redis可能禁止CONFIG，未开启时仅依赖兜底巡检）
+        """
+        try:
+            config = await self.redis.config_get("notify-keyspace-events")
+            # 未设置 decode_responses 的客户端返回 bytes 键值
+            flags = config.get("notify-keyspace-events", config.get(b"notify-keyspace-events", ""))
+            if isinstance(flags, bytes):
+                flags = flags.decode()
+            # E 为 keyevent 通道，x 为过期事件（A 包含 x）
+            if "E" in flags and ("x" in flags or "A" in flags):
+                return
+            
+            if not self.configure_keyspace_events:
+                logger.warning(
+                    f"⚠️ Redis 未开启键过期通知(notify-keyspace-events='{flags}')，将依赖定时巡检；"
+                    f"请在 Redis 配置中设置 notify-keyspace-events Ex"
+                )
+                return
+            
+            new_flags = "".join(sorted(set(flags) | {"E", "x"}))
+            await self.redis.config_set("notify-keyspace-events", new_flags)
+            logger.info(f"🔔 已开启键过期通知: notify-keyspace-events='{new_flags}'")
+        except Exception as e:
+            logger.warning(f"⚠️ 无法开启键过期通知，将依赖定时巡检: {e}")
+    
+    async def _expiry_listener_loop(self):
+        """监听心跳键过期事件，仅在服务真正超时时处理"""
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.psubscribe("__keyevent@*__:expired")
+            while self._running:
+                try:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if not message:
+                        continue
+                    
+                    key = message["data"]
+                    if isinstance(key, bytes):
+                        key = key.decode()
+                    if self._is_health_leader and key.startswith(self.heartbeat_key_prefix):
+                        await self._on_heartbeat_expired(key[len(self.heartbeat_key_prefix):])
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ 处理心跳过期事件异常: {e}")
+                    await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            pass
+        finally:
             try:
-                await self._health_check_task
-            except asyncio.CancelledError:
+                await pubsub.reset()
+            except Exception:
                 pass
-        logger.info("🛑 停止服务健康监控")
+    
+    async def _on_heartbeat_expired(self, service_id: str):
+        """心跳键过期：将健康服务标记为不健康"""
+        service_data = await self.redis.hget(self.services_key, service_id)
+        if not service_data:
+            return
+        
+        service_info = ServiceInfo.from_dict(_json_loads(service_data))
+        if service_info.status == ServiceStatus.HEALTHY:
+            await self._mark_unhealthy(service_info)
+            logger.warning("💔 服务不健康: %s", service_info.service_name)
+    
+    async def _mark_unhealthy(self, service_info: ServiceInfo):
+        """写回不健康状态并发布事件"""
+        service_info.status = ServiceStatus.UNHEALTHY
+        service_info.invalidate_cache()
+        service_dict = service_info.to_dict()
+        service_json = service_info.serialized()
+        
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(
+            self.services_key,
+            service_info.service_id,
+            service_json
+        )
+        self._queue_status_index(pipe, service_info.service_id, ServiceStatus.UNHEALTHY)
+        await pipe.execute()
+        
+        self._enqueue_event("service_unhealthy", service_json)
+        self._fire_event_callbacks("service_unhealthy", service_dict)
     
     async def _health_check_loop(self):
-        """健康检查循环"""
+        """健康检查循环：按续期间隔维持主节点锁，主节点按巡检间隔执行兜底巡检"""
+        last_sweep = 0.0
         while self._running:
             try:
-                await self._check_service_health()
-                await asyncio.sleep(self.heartbeat_interval)
+                was_leader = self._is_health_leader
+                if await self._acquire_health_leader():
+                    now = time.monotonic()
+                    # 刚成为主节点时立即巡检，补上主节点切换期间漏掉的过期事件
+                    if not was_leader or now - last_sweep >= self.health_sweep_interval:
+                        await self._check_service_health()
+                        last_sweep = now
+                await asyncio.sleep(self.health_leader_renew_interval)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"❌ 健康检查异常: {e}")
                 await asyncio.sleep(5)  # 异常时短暂休息
     
+    async def _acquire_health_leader(self) -> bool:
+        """获取或续期健康巡检主节点锁"""
+        lock_ttl_ms = int(self.health_leader_renew_interval * 1000 * 3)
+        was_leader = self._is_health_leader
+        
+        if self._is_health_leader:
+            renewed = await self.redis.eval(
+                _RENEW_LEADER_LUA, 1, self.health_leader_key, self._instance_id, lock_ttl_ms
+            )
+            self._is_health_leader = bool(renewed)
+        
+        if not self._is_health_leader:
+            acquired = await self.redis.set(
+                self.health_leader_key, self._instance_id, nx=True, px=lock_ttl_ms
+            )
+            self._is_health_leader = bool(acquired)
+        
+        if self._is_health_leader != was_leader:
+            if self._is_health_leader:
+                logger.info(f"👑 成为健康巡检主节点: {self._instance_id}")
+            else:
+                logger.info(f"🔄 失去健康巡检主节点身份: {self._instance_id}")
+        
+        return self._is_health_leader
+    
+    async def _release_health_leader(self):
+        """释放主节点锁（仅当锁仍属于本实例）"""
+        if not self._is_health_leader:
+            return
+        
+        self._is_health_leader = False
+        try:
+            await self.redis.eval(_RELEASE_LEADER_LUA, 1, self.health_leader_key, self._instance_id)
+        except Exception as e:
+            logger.warning(f"⚠️ 释放健康巡检主节点锁失败: {e}")
+    
     async def _check_service_health(self):
-        """检查所有服务健康状态"""
+        """兜底巡检：处理过期通知丢失及注册后从未发送心跳的服务"""
         try:
             current_time = time.time()
             all_services = await self.redis.hgetall(self.services_key)
+            if not all_services:
+                return
             
-            for service_id, service_data in all_services.items():
+            service_ids = list(all_services.keys())
+            heartbeats = await self.redis.mget([self._heartbeat_key(sid) for sid in service_ids])
+            
+            for service_id, heartbeat_data in zip(service_ids, heartbeats):
                 try:
-                    service_info = ServiceInfo.from_dict(json.loads(service_data))
-                    
-                    # 检查心跳超时
-                    heartbeat_data = await self.redis.hget(self.heartbeat_key, service_id)
                     if heartbeat_data:
-                        last_heartbeat = float(heartbeat_data)
-                        if current_time - last_heartbeat > self.health_timeout:
-                            # 服务不健康
-                            if service_info.status == ServiceStatus.HEALTHY:
-                                service_info.status = ServiceStatus.UNHEALTHY
-                                
-                                await self.redis.hset(
-                                    self.services_key,
-                                    service_id,
-                                    json.dumps(service_info.to_dict())
-                                )
-                                
-                                await self._publish_event("service_unhealthy", service_info.to_dict())
-                                logger.warning(f"💔 服务不健康: {service_info.service_name}")
+                        continue
                     
-                    elif service_info.status == ServiceStatus.HEALTHY:
-                        # 没有心跳记录但状态为健康，检查是否是刚注册的服务
-                        time_since_registration = current_time - service_info.registered_at
-                        if time_since_registration > 30:  # 注册超过30秒仍无心跳才警告
-                            service_info.status = ServiceStatus.UNHEALTHY
-                            
-                            await self.redis.hset(
-                                self.services_key,
-                                service_id,
-                                json.dumps(service_info.to_dict())
-                            )
-                            
-                            await self._publish_event("service_unhealthy", service_info.to_dict())
-                            logger.warning(f"💔 服务缺失心跳: {service_info.service_name}")
+                    # 只读字段直接比较，仅在需要变更状态时才构造 ServiceInfo
+                    data = _json_loads(all_services[service_id])
+                    if data["status"] != ServiceStatus.HEALTHY.value:
+                        continue
+                    
+                    # 心跳键已过期或从未写入，注册超过30秒才标记
+                    time_since_registration = current_time - data["registered_at"]
+                    if time_since_registration > 30:
+                        service_info = ServiceInfo.from_dict(data)
+                        await self._mark_unhealthy(service_info)
+                        logger.warning("💔 服务缺失心跳: %s", service_info.service_name)
                 
                 except Exception as e:
-                    logger.warning(f"⚠️ 检查服务健康状态失败: {service_id} - {e}")
+                    logger.warning("⚠️ 检查服务健康状态失败: %s - %s", service_id, e)
                     
         except Exception as e:
             logger.error(f"❌ 健康检查失败: {e}")
     
-    async def _publish_event(self, event_type: str, service_data: Dict[str, Any]):
-        """发布服务事件"""
+    def _enqueue_event(self, event_type: str, service_json: str):
+        """事件写入为旁路操作：放入待发送队列，由后台任务批量写入（service_json 为已序列化的服务信息）"""
+        self._pending_events.append({
+            "event_type": event_type,
+            "service_data": service_json,
+            "timestamp": str(time.time())
+        })
+        
+        if self._event_drain_task is None or self._event_drain_task.done():
+            self._event_drain_task = asyncio.create_task(self._event_drain_loop())
+    
+    async def _event_drain_loop(self):
+        """短暂聚合后批量写入事件，直到队列为空"""
+        while self._pending_events:
+            if len(self._pending_events) < self.event_batch_size:
+                await asyncio.sleep(self.event_flush_interval)
+            await self._drain_events()
+    
+    async def _drain_events(self):
+        """将当前待发送事件通过单个管道写入事件流"""
+        if not self._pending_events:
+            return
+        
+        events, self._pending_events = self._pending_events, []
         try:
-            event = {
-                "event_type": event_type,
-                "service_data": service_data,
-                "timestamp": time.time()
-            }
-            
-            await self.redis.lpush(
-                self.events_key,
-                json.dumps(event)
-            )
-            
-            # 保留最近1000个事件
-            await self.redis.ltrim(self.events_key, 0, 999)
+            pipe = self.redis.pipeline(transaction=False)
+            for event in events:
+                # MAXLEN ~ 在写入时近似裁剪，单条命令完成
+                pipe.xadd(
+                    self.events_key,
+                    event,
+                    maxlen=self.events_maxlen,
+                    approximate=True
+                )
+            await pipe.execute()
             
-            # 调用注册的回调函数
-            for callback in self.event_callbacks.get(event_type, []):
-                try:
-                    if asyncio.iscoroutinefunction(callback):
-                        await callback(service_data)
-                    else:
-                        callback(service_data)
-                except Exception as e:
-                    logger.error(f"❌ 事件回调执行失败: {e}")
+        except Exception as e:
+            logger.error(f"❌ 写入服务事件失败({len(events)}条): {e}")
+    
+    async def read_events(self, last_id: str = "$", block_ms: int = 5000,
+                          count: int = 100) -> List[Dict[str, Any]]:
+        """阻塞读取事件流，返回 last_id 之后的事件（每条带 event_id，供下次调用续读）"""
+        try:
+            response = await self.redis.xread({self.events_key: last_id}, count=count, block=block_ms)
+            events = []
+            for _, messages in response or []:
+                for event_id, fields in messages:
+                    events.append({
+                        "event_id": event_id,
+                        "event_type": fields["event_type"],
+                        "service_data": _decompress_metadata(_json_loads(fields["service_data"])),
+                        "timestamp": float(fields["timestamp"])
+                    })
+            return events
             
         except Exception as e:
-            logger.error(f"❌ 发布事件失败: {e}")
+            logger.error(f"❌ 读取服务事件失败: {e}")
+            return []
+    
+    def _fire_event_callbacks(self, event_type: str, service_data: Dict[str, Any]):
+        """在后台任务中执行回调，调用方无需等待监听器完成"""
+        if not self.event_callbacks.get(event_type):
+            return
+        
+        task = asyncio.create_task(self._dispatch_event_callbacks(event_type, service_data))
+        self._callback_tasks.add(task)
+        task.add_done_callback(self._callback_tasks.discard)
+    
+    async def _dispatch_event_callbacks(self, event_type: str, service_data: Dict[str, Any]):
+        """并发调用注册的回调函数"""
+        callbacks = self.event_callbacks.get(event_type, [])
+        if not callbacks:
+            return
+        
+        results = await asyncio.gather(
+            *(self._run_callback(callback, service_data) for callback in callbacks),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"❌ 事件回调执行失败: {result}")
+    
+    async def _run_callback(self, callback: Callable, service_data: Dict[str, Any]):
+        """在并发上限内执行单个回调，同步回调在线程池中运行"""
+        async with self._callback_semaphore:
+            if asyncio.iscoroutinefunction(callback):
+                await callback(service_data)
+            else:
+                if self._callback_pool is None:
+                    self._callback_pool = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=8, thread_name_prefix="registry-callback"
+                    )
+                await asyncio.get_running_loop().run_in_executor(
+                    self._callback_pool, callback, service_data
+                )
     
     def add_event_listener(self, event_type: str, callback: Callable):
         """添加事件监听器"""
@@ -379,6 +981,17 @@ class ServiceRegistry:
     
     async def get_service_stats(self) -> Dict[str, Any]:
         """获取服务统计信息"""
+        try:
+            raw_stats = await self._stats_script(keys=[self.services_key])
+            stats = _json_loads(raw_stats)
+            # cjson 可能将空表编码为数组
+            stats["services_by_type"] = stats.get("services_by_type") or {}
+            stats["services_by_status"] = stats.get("services_by_status") or {}
+            return stats
+            
+        except Exception as e:
+            logger.warning(f"⚠️ 服务端统计脚本执行失败，回退到本地统计: {e}")
+        
         try:
             all_services = await self.get_services()
             
@@ -421,11 +1034,19 @@ class ServiceClient:
     服务客户端 - 用于自动注册和心跳
     """
     
-    def __init__(self, registry: ServiceRegistry, service_info: ServiceInfo):
+    def __init__(self, registry: ServiceRegistry, service_info: ServiceInfo,
+                 min_interval: Optional[float] = None, max_interval: Optional[float] = None):
         self.registry = registry
         self.service_info = service_info
         self._heartbeat_task = None
         self._running = False
+        
+        # 自适应心跳间隔：成功时逐步放宽至 max_interval，失败时回到 min_interval
+        self.min_interval = min_interval if min_interval is not None else registry.heartbeat_interval
+        self.max_interval = max_interval if max_interval is not None else registry.health_timeout / 2
+        self._backoff = self.min_interval
+        # 上次完整心跳（含状态恢复）成功的时间，间隔内只发送快速心跳
+        self._last_marked_healthy_at = 0.0
     
     async def start(self) -> bool:
         """启动服务客户端"""
@@ -471,29 +1092,65 @@ class ServiceClient:
         """心跳循环"""
         while self._running:
             try:
-                await self.registry.heartbeat(self.service_info.service_id)
-                await asyncio.sleep(self.registry.heartbeat_interval)
+                service_id = self.service_info.service_id
+                now = time.time()
+                if now - self._last_marked_healthy_at >= self.registry.health_timeout / 2:
+                    success = await self.registry.heartbeat(service_id)
+                    self._last_marked_healthy_at = now if success else 0.0
+                else:
+                    success = await self.registry.touch_heartbeat(service_id)
+                    if not success:
+                        self._last_marked_healthy_at = 0.0
+                
+                if success:
+                    self._backoff = min(self._backoff * 1.5, self.max_interval)
+                else:
+                    self._backoff = self.min_interval
+                await asyncio.sleep(self._backoff)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"❌ 心跳异常: {e}")
+                self._last_marked_healthy_at = 0.0
+                self._backoff = self.min_interval
                 await asyncio.sleep(5)
     
     def update_metadata(self, metadata: Dict[str, Any]):
-        """更新服务元数据"""
+        """更新服务元数据（仅本地）"""
+        self.service_info.metadata.update(metadata)
+        self.service_info.invalidate_cache()
+    
+    def update_metadata_cmd(self, pipe, metadata: Dict[str, Any]):
+        """更新服务元数据，并把持久化写入排入调用方管道（由调用方执行）"""
         self.service_info.metadata.update(metadata)
+        self.service_info.last_heartbeat = time.time()
+        self.service_info.invalidate_cache()
+        self.registry.queue_service_info(pipe, self.service_info)
 
 
 # 全局服务注册表实例
 service_registry: Optional[ServiceRegistry] = None
+_registry_lock = asyncio.Lock()
 
-async def get_service_registry(redis_client: redis.Redis) -> ServiceRegistry:
-    """获取全局服务注册表实例"""
+async def get_service_registry(redis_client: redis.Redis,
+                               configure_keyspace_events: Optional[bool] = None) -> ServiceRegistry:
+    """
+    获取全局服务注册表实例（并发首次调用只创建一个实例和一组健康监控任务）
+    
+    configure_keyspace_events 未指定时读取环境变量 VTOX_CONFIGURE_KEYSPACE_EVENTS（默认 false）
+    """
     global service_registry
     
-    if service_registry is None:
-        service_registry = ServiceRegistry(redis_client)
-        await service_registry.start_health_monitoring()
+    if service_registry is not None:
+        return service_registry
+    
+    async with _registry_lock:
+        if service_registry is None:
+            if configure_keyspace_events is None:
+                configure_keyspace_events = os.getenv("VTOX_CONFIGURE_KEYSPACE_EVENTS", "false").lower() == "true"
+            registry = ServiceRegistry(redis_client, configure_keyspace_events=configure_keyspace_events)
+            await registry.start_health_monitoring()
+            service_registry = registry
     
     return service_registry
 
@@ -553,4 +1210,27 @@ async def register_worker_service(registry: ServiceRegistry, host: str, port: in
         fault_types,
         {"role": "worker", "fault_types": fault_types}
     )
-    return ServiceClient(registry, service_info)
\ No newline at end of file
+    return ServiceClient(registry, service_info)
+
+
+def _prewarm_serializers():
+    """导入时预热序列化路径，避免首次注册/心跳承担懒初始化开销"""
+    try:
+        service_info = ServiceInfo(
+            service_id="prewarm",
+            service_type=ServiceType.WORKER,
+            service_name="prewarm",
+            host="localhost",
+            port=0,
+            status=ServiceStatus.STARTING,
+            capabilities=[],
+            metadata={},
+            last_heartbeat=0,
+            registered_at=0
+        )
+        ServiceInfo.from_dict(_json_loads(service_info.serialized()))
+    except Exception as e:
+        logger.debug(f"序列化预热失败: {e}")
+
+
+_prewarm_serializers()
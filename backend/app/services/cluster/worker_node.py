@@ -18,18 +18,64 @@ import asyncio
 import json
 import logging
 import time
+import numpy as np
 import psutil
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import asdict, dataclass
+import socket
 import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .service_registry import ServiceRegistry, ServiceClient, ServiceType, create_service_info
 from ..redis_stream.distributed_diagnosis_stream import DistributedDiagnosisStream, FaultType
 
 logger = logging.getLogger("worker-node")
 
+# TCP保活参数（TCP_KEEPIDLE/TCP_KEEPINTVL 仅部分平台提供）
+_KEEPALIVE_OPTIONS = {
+    opt: value
+    for opt, value in (
+        (getattr(socket, "TCP_KEEPIDLE", None), 30),
+        (getattr(socket, "TCP_KEEPINTVL", None), 10),
+    )
+    if opt is not None
+}
+
+# 负载报告序列化优先使用 orjson（直接输出bytes，可选依赖，未安装时回退标准库）
+_json_dumps = orjson.dumps if orjson is not None else json.dumps
+
+@dataclass(slots=True)
+class LoadReport:
+    """Worker负载报告（仅可变数值，worker_id 即哈希字段名）"""
+    current_tasks: int
+    pending_messages: int
+    avg_processing_time: float
+    p50_processing_time: float
+    p95_processing_time: float
+    cpu_usage: float
+    memory_usage: float
+    success_rate: float
+    total_completed: int
+    total_failed: int
+    consecutive_failures: int
+    last_updated: float
+    healthy: bool
+
+# orjson 原生序列化 dataclass，无需先构建中间dict
+_encode_load_report = (
+    orjson.dumps if orjson is not None
+    else lambda report: json.dumps(asdict(report))
+)
+
 @dataclass
 class WorkerConfig:
     """Worker节点配置"""
@@ -54,20 +100,45 @@ class ResourceMonitor:
             "network_io": 0,
             "last_updated": time.time()
         }
+        
+        # 指标缓存：多个循环在 _cache_ttl 内共享同一份快照
+        self._cache_ttl = 2.0
+        self._cached_metrics: Optional[Dict[str, Any]] = None
+        self._cached_at = 0.0  # 缓存时刻（单调时钟，不受系统时间调整影响）
+        
+        # 预热CPU采样基准，之后可用 interval=None 非阻塞读取
+        psutil.cpu_percent(interval=None)
+        self.process.cpu_percent()
+    
+    def _fresh_cached_metrics(self) -> Optional[Dict[str, Any]]:
+        """返回仍在有效期内的缓存快照"""
+        if self._cached_metrics and time.monotonic() - self._cached_at < self._cache_ttl:
+            return self._cached_metrics
+        return None
     
     def get_system_metrics(self) -> Dict[str, Any]:
-        """获取系统资源指标"""
+        """获取系统资源指标（同步版本，供非异步上下文使用）"""
+        return self._fresh_cached_metrics() or self._collect_sync()
+    
+    async def get_system_metrics_async(self) -> Dict[str, Any]:
+        """获取系统资源指标（在线程中执行psutil调用，statvfs等慢系统调用不阻塞事件循环）"""
+        return self._fresh_cached_metrics() or await asyncio.to_thread(self._collect_sync)
+    
+    def _collect_sync(self) -> Dict[str, Any]:
+        """采集系统资源指标并刷新缓存"""
+        now = time.time()
         try:
-            # CPU使用率
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            # CPU使用率（相对上次调用的非阻塞采样）
+            cpu_percent = psutil.cpu_percent(interval=None)
             
             # 内存使用率
             memory = psutil.virtual_memory()
             memory_percent = memory.percent
             
-            # 进程资源使用
-            process_memory = self.process.memory_info().rss / 1024 / 1024  # MB
-            process_cpu = self.process.cpu_percent()
+            # 进程资源使用（oneshot 合并内核读取）
+            with self.process.oneshot():
+                process_memory = self.process.memory_info().rss / 1024 / 1024  # MB
+                process_cpu = self.process.cpu_percent()
             
             # 磁盘使用率
             disk = psutil.disk_usage('/')
@@ -84,11 +155,13 @@ class ResourceMonitor:
                 "process_memory_mb": process_memory,
                 "process_cpu_usage": process_cpu,
                 "network_io_bytes": network_total,
-                "timestamp": time.time(),
+                "timestamp": now,
                 "healthy": self._calculate_health_status(cpu_percent, memory_percent)
             }
             
             self.system_stats.update(metrics)
+            self._cached_metrics = metrics
+            self._cached_at = time.monotonic()
             return metrics
             
         except Exception as e:
@@ -109,10 +182,15 @@ class ResourceMonitor:
 class WorkerLoadReporter:
     """Worker负载报告器"""
     
-    def __init__(self, redis_client: redis.Redis, worker_id: str):
+    def __init__(self, redis_client: redis.Redis, worker_id: str,
+                 fault_types: Optional[List[str]] = None):
         self.redis = redis_client
         self.worker_id = worker_id
+        self.fault_types = list(fault_types or [])
         self.load_key = "vtox:coordinator:worker_loads"
+        # 静态元数据单独存放，仅首次报告时写入，周期性报告只携带变化的数值
+        self.meta_key = "vtox:coordinator:worker_meta"
+        self._cold_reported = False
         
         # 负载统计
         self.load_stats = {
@@ -120,24 +198,27 @@ class WorkerLoadReporter:
             "completed_tasks": 0,
             "failed_tasks": 0,
             "total_processing_time": 0,
-            "start_time": time.time(),
+            "consecutive_failures": 0,  # 消费者连续失败次数，协调器可据此将节点移出轮转
+            "start_time": time.time(),  # 墙上时间，仅用于对外展示
+            "start_monotonic": time.monotonic(),  # 运行时长计算使用单调时钟
             "last_report_time": time.time()
         }
         
         # 任务队列监控
         self.pending_messages = 0
-        self.processing_times = []  # 保留最近100次处理时间
+        # 最近100次处理时间：定长float32环形缓冲区，百分位用 np.partition 计算
+        self._buf = np.zeros(100, dtype=np.float32)
+        self._buf_i = 0
+        self._buf_len = 0
         
-    async def report_load(self, resource_metrics: Dict[str, Any]):
-        """报告负载状态到协调器"""
+    async def report_load(self, resource_metrics: Dict[str, Any],
+                          extra_commands: Optional[Callable[[Any], None]] = None):
+        """报告负载状态到协调器（extra_commands 可向同一管道追加其他写入）"""
         try:
             current_time = time.time()
             
-            # 计算平均处理时间
-            avg_processing_time = (
-                sum(self.processing_times) / len(self.processing_times)
-                if self.processing_times else 100.0
-            )
+            # 计算平均处理时间及p50/p95
+            avg_processing_time, p50_processing_time, p95_processing_time = self._processing_time_stats()
             
             # 计算成功率
             total_tasks = self.load_stats["completed_tasks"] + self.load_stats["failed_tasks"]
@@ -147,28 +228,48 @@ class WorkerLoadReporter:
             )
             
             # 构建负载报告
-            load_report = {
-                "worker_id": self.worker_id,
-                "current_tasks": self.load_stats["current_tasks"],
-                "pending_messages": self.pending_messages,
-                "avg_processing_time": avg_processing_time,
-                "cpu_usage": resource_metrics.get("system_cpu_usage", 0),
-                "memory_usage": resource_metrics.get("system_memory_usage", 0),
-                "success_rate": success_rate,
-                "total_completed": self.load_stats["completed_tasks"],
-                "total_failed": self.load_stats["failed_tasks"],
-                "uptime": current_time - self.load_stats["start_time"],
-                "last_updated": current_time,
-                "healthy": resource_metrics.get("healthy", True)
-            }
+            load_report = LoadReport(
+                current_tasks=self.load_stats["current_tasks"],
+                pending_messages=self.pending_messages,
+                avg_processing_time=avg_processing_time,
+                p50_processing_time=p50_processing_time,
+                p95_processing_time=p95_processing_time,
+                cpu_usage=resource_metrics.get("system_cpu_usage", 0),
+                memory_usage=resource_metrics.get("system_memory_usage", 0),
+                success_rate=success_rate,
+                total_completed=self.load_stats["completed_tasks"],
+                total_failed=self.load_stats["failed_tasks"],
+                consecutive_failures=self.load_stats["consecutive_failures"],
+                last_updated=current_time,
+                healthy=resource_metrics.get("healthy", True)
+            )
             
-            # 发送到Redis
-            await self.redis.hset(
+            # 发送到Redis（写入与过期设置合并为一次往返）
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(
                 self.load_key,
                 self.worker_id,
-                json.dumps(load_report)
+                _encode_load_report(load_report)
             )
-            
+            pipe.expire(self.load_key, 120)
+            if extra_commands is not None:
+                extra_commands(pipe)
+            send_cold = not self._cold_reported
+            if send_cold:
+                # uptime 由读取方根据 start_time 自行计算
+                pipe.hset(
+                    self.meta_key,
+                    self.worker_id,
+                    _json_dumps({
+                        "worker_id": self.worker_id,
+                        "fault_types": self.fault_types,
+                        "start_time": self.load_stats["start_time"]
+                    })
+                )
+            await pipe.execute()
+            
+            if send_cold:
+                self._cold_reported = True
             self.load_stats["last_report_time"] = current_time
             
             logger.debug(f"📊 负载报告已发送: 任务{self.load_stats['current_tasks']} "
@@ -191,13 +292,31 @@ class WorkerLoadReporter:
         else:
             self.load_stats["failed_tasks"] += 1
         
-        # 记录处理时间
-        self.processing_times.append(processing_time)
-        if len(self.processing_times) > 100:
-            self.processing_times.pop(0)
+        # 记录处理时间（窗口满时覆盖最旧值）
+        self._buf[self._buf_i] = processing_time
+        self._buf_i = (self._buf_i + 1) % len(self._buf)
+        self._buf_len = min(len(self._buf), self._buf_len + 1)
         
         self.load_stats["total_processing_time"] += processing_time
     
+    def _processing_time_stats(self) -> Tuple[float, float, float]:
+        """窗口内处理时间的 (平均值, p50, p95)，无记录时均为默认值100"""
+        if self._buf_len == 0:
+            return 100.0, 100.0, 100.0
+        view = self._buf[:self._buf_len]
+        k50 = int(0.50 * (self._buf_len - 1))
+        k95 = int(0.95 * (self._buf_len - 1))
+        part = np.partition(view, (k50, k95))
+        return float(view.mean(dtype=np.float64)), float(part[k50]), float(part[k95])
+    
+    def record_consumer_failure(self):
+        """记录一次消费者失败"""
+        self.load_stats["consecutive_failures"] += 1
+    
+    def record_consumer_success(self):
+        """消费者恢复正常，清零连续失败计数"""
+        self.load_stats["consecutive_failures"] = 0
+    
     def update_pending_messages(self, count: int):
         """更新待处理消息数"""
         self.pending_messages = count
@@ -214,10 +333,14 @@ class DistributedWorkerNode:
         self.diagnosis_stream: Optional[DistributedDiagnosisStream] = None
         self.resource_monitor = ResourceMonitor()
         self.load_reporter: Optional[WorkerLoadReporter] = None
+        # 诊断计算线程池：分析器调用移出事件循环，监控/负载报告不被阻塞
+        self._compute_pool: Optional[ThreadPoolExecutor] = None
         
         # 运行状态
         self.is_running = False
         self.worker_tasks = []
+        # 停机时等待工作循环退出的最长时间(秒)，超时后仍关闭线程池和连接
+        self._shutdown_drain_timeout = 10.0
         
         # 故障类型映射
         self.fault_type_mapping = {
@@ -227,25 +350,52 @@ class DistributedWorkerNode:
             "eccentricity": FaultType.ECCENTRICITY,
             "broken_bar": FaultType.BROKEN_BAR
         }
+        
+        # 预先筛选本节点支持的故障类型：(类型字符串, 枚举, 消费者组名, 消费者ID)
+        self._active_fault_types = [
+            (ft_str, self.fault_type_mapping[ft_str], f"{ft_str}_diagnosis_group",
+             f"{config.worker_id}_{ft_str}_consumer")
+            for ft_str in config.fault_types
+            if ft_str in self.fault_type_mapping
+        ]
+        self._active_group_names = frozenset(group for _, _, group, _ in self._active_fault_types)
     
     async def initialize(self) -> bool:
         """初始化Worker节点"""
         try:
-            # 连接Redis
-            self.redis_client = redis.from_url(
+            # 连接Redis：显式配置连接池，负载报告、待处理探测与诊断消费者共用同一客户端
+            pool = redis.ConnectionPool.from_url(
                 self.config.redis_url,
+                # 每个故障消费者的阻塞XREADGROUP独占一个连接，其余留给结果写入、注册表心跳与负载报告
+                max_connections=max(8, 2 * len(self.config.fault_types) + 4),
                 decode_responses=True,
-                retry_on_timeout=True,
+                # 显式重试策略：短指数退避，只针对超时/连接错误，替代 retry_on_timeout
+                retry=Retry(ExponentialBackoff(cap=1, base=0.05), 3),
+                retry_on_error=[redis.TimeoutError, redis.ConnectionError],
+                # TCP保活，空闲期间连接保持可用
+                socket_keepalive=True,
+                socket_keepalive_options=_KEEPALIVE_OPTIONS,
                 health_check_interval=30
             )
+            self.redis_client = redis.Redis(connection_pool=pool)
             await self.redis_client.ping()
             
-            # 初始化分布式诊断系统
-            self.diagnosis_stream = DistributedDiagnosisStream(self.config.redis_url)
+            # 初始化分布式诊断系统（复用同一连接池，避免两套独立连接池）
+            self._compute_pool = ThreadPoolExecutor(
+                max_workers=self.config.max_concurrent_tasks,
+                thread_name_prefix=f"{self.config.worker_id}-diagnosis"
+            )
+            self.diagnosis_stream = DistributedDiagnosisStream(
+                self.config.redis_url, redis_client=self.redis_client,
+                compute_executor=self._compute_pool,
+                max_concurrent_analyses=self.config.max_concurrent_tasks
+            )
             await self.diagnosis_stream.connect()
             
             # 初始化负载报告器
-            self.load_reporter = WorkerLoadReporter(self.redis_client, self.config.worker_id)
+            self.load_reporter = WorkerLoadReporter(
+                self.redis_client, self.config.worker_id, self.config.fault_types
+            )
             
             # 注册为服务
             await self._register_service()
@@ -302,19 +452,12 @@ class DistributedWorkerNode:
             
             self.is_running = True
             
-            # 启动各种工作任务
-            self.worker_tasks = [
-                asyncio.create_task(self._fault_processing_loop()),
-                asyncio.create_task(self._resource_monitoring_loop()),
-                asyncio.create_task(self._load_reporting_loop()),
-                asyncio.create_task(self._health_check_loop())
-            ]
+            # 启动各种工作任务（由同一个监管任务托管，取消时统一回收）
+            self.worker_tasks = [asyncio.create_task(self._run_worker_tasks())]
             
             logger.info(f"🚀 Worker节点启动成功: {self.config.worker_id}")
             logger.info("   🔧 故障处理: 启动")
-            logger.info("   📊 资源监控: 启动") 
-            logger.info("   📈 负载报告: 启动")
-            logger.info("   💓 健康检查: 启动")
+            logger.info("   📊 资源监控/📈 负载报告/💓 健康检查: 统一监控循环启动")
             
             return True
             
@@ -322,8 +465,28 @@ class DistributedWorkerNode:
             logger.error(f"❌ 启动Worker节点失败: {e}")
             return False
     
+    async def _run_worker_tasks(self):
+        """监管工作循环：任一循环异常退出或自身被取消时，取消其余循环并等待全部结束"""
+        tasks = [
+            asyncio.create_task(self._fault_processing_loop()),
+            asyncio.create_task(self._unified_monitor_loop())
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for task in done:
+            exc = None if task.cancelled() else task.exception()
+            if exc is not None:
+                raise exc
+    
     async def stop_worker(self):
         """停止Worker节点"""
+        drain = None
         try:
             self.is_running = False
             
@@ -332,88 +495,91 @@ class DistributedWorkerNode:
                 if not task.done():
                     task.cancel()
             
-            # 等待任务完成
+            # 等待任务完成（shield：调用方在停机中途被取消时，回收过程仍会完成）
             if self.worker_tasks:
-                await asyncio.gather(*self.worker_tasks, return_exceptions=True)
+                drain = asyncio.gather(*self.worker_tasks, return_exceptions=True)
+                await asyncio.shield(drain)
             
             # 注销服务
             if self.service_client:
                 await self.service_client.stop()
             
-            # 清理Redis连接
-            if self.redis_client:
-                await self.redis_client.close()
-            
             logger.info(f"🛑 Worker节点已停止: {self.config.worker_id}")
             
         except Exception as e:
             logger.error(f"❌ 停止Worker节点失败: {e}")
+        finally:
+            # 调用方被取消时回收仍在进行：先等待工作循环退出（有超时），再关闭其依赖的线程池和连接
+            if drain is not None and not drain.done():
+                _, pending = await asyncio.wait({drain}, timeout=self._shutdown_drain_timeout)
+                if pending:
+                    logger.warning(f"⚠️ 工作任务在{self._shutdown_drain_timeout}秒内未退出，强制关闭资源")
+            
+            # 关闭诊断计算线程池
+            if self._compute_pool:
+                self._compute_pool.shutdown(wait=False, cancel_futures=True)
+            
+            # 清理Redis连接（诊断系统共用同一连接池）
+            if self.redis_client:
+                await self.redis_client.close()
+                await self.redis_client.connection_pool.disconnect()
     
     async def _fault_processing_loop(self):
-        """故障处理循环"""
+        """故障处理循环（事件驱动：仅在消费者任务退出时唤醒并重启）"""
         logger.info("🔧 启动故障处理循环")
         
-        # 存储消费者任务
-        consumer_tasks = []
+        # 消费者任务 -> 故障类型，重启后仍能准确对应
+        task_to_fault: Dict[asyncio.Task, tuple] = {}
         
         try:
             # 为每种故障类型启动专门的消费者（只启动一次）
-            for fault_type_str in self.config.fault_types:
-                if fault_type_str in self.fault_type_mapping:
-                    fault_type = self.fault_type_mapping[fault_type_str]
+            for active in self._active_fault_types:
+                task_to_fault[self._spawn_fault_consumer(active)] = active
+            
+            logger.info(f"✅ 已启动{len(task_to_fault)}个故障消费者")
+            
+            # 监控消费者任务状态：等待任一消费者结束后立即重启
+            while self.is_running and task_to_fault:
+                done, _ = await asyncio.wait(
+                    task_to_fault.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    active = task_to_fault.pop(task)
+                    if not self.is_running:
+                        continue
+                    exc = None if task.cancelled() else task.exception()
+                    logger.warning(f"⚠️ 消费者任务异常结束: {active[0]}" + (f" - {exc}" if exc else ""))
                     
-                    # 启动故障诊断消费者 (复用现有架构)
-                    consumer_id = f"{self.config.worker_id}_{fault_type_str}_consumer"
-                    
-                    # 创建消费者任务
-                    consumer_task = asyncio.create_task(
-                        self._run_fault_consumer(fault_type, consumer_id)
-                    )
-                    consumer_tasks.append(consumer_task)
-                    logger.debug(f"✅ 启动消费者: {consumer_id}")
-            
-            logger.info(f"✅ 已启动{len(consumer_tasks)}个故障消费者")
-            
-            # 监控消费者任务状态
-            while self.is_running:
-                # 检查是否有任务异常结束
-                for i, task in enumerate(consumer_tasks[:]):
-                    if task.done():
-                        fault_type_str = self.config.fault_types[i % len(self.config.fault_types)]
-                        logger.warning(f"⚠️ 消费者任务异常结束: {fault_type_str}")
-                        
-                        # 重新启动异常结束的消费者
-                        if fault_type_str in self.fault_type_mapping:
-                            fault_type = self.fault_type_mapping[fault_type_str]
-                            consumer_id = f"{self.config.worker_id}_{fault_type_str}_consumer"
-                            
-                            new_task = asyncio.create_task(
-                                self._run_fault_consumer(fault_type, consumer_id)
-                            )
-                            consumer_tasks[i] = new_task
-                            logger.info(f"🔄 重新启动消费者: {consumer_id}")
-                
-                # 等待60秒后再次检查
-                await asyncio.sleep(60)
+                    # 重新启动异常结束的消费者（短暂退避，避免立即失败时空转）
+                    await asyncio.sleep(1)
+                    task_to_fault[self._spawn_fault_consumer(active)] = active
+                    logger.info(f"🔄 重新启动消费者: {active[3]}")
                 
         except asyncio.CancelledError:
             logger.info("🛑 故障处理循环被取消")
             # 取消所有消费者任务
-            for task in consumer_tasks:
+            for task in task_to_fault:
                 if not task.done():
                     task.cancel()
         except Exception as e:
             logger.error(f"❌ 故障处理循环异常: {e}")
             # 取消所有消费者任务
-            for task in consumer_tasks:
+            for task in task_to_fault:
                 if not task.done():
                     task.cancel()
     
+    def _spawn_fault_consumer(self, active: tuple) -> asyncio.Task:
+        """为指定故障类型创建消费者任务 (复用现有架构)"""
+        _, fault_type, _, consumer_id = active
+        logger.debug(f"✅ 启动消费者: {consumer_id}")
+        return asyncio.create_task(self._run_fault_consumer(fault_type, consumer_id))
+    
     async def _run_fault_consumer(self, fault_type: FaultType, consumer_id: str):
-        """运行故障消费者"""
+        """运行故障消费者（失败时指数退避+随机抖动重试，避免集群内重连风暴）"""
+        backoff = 1
         try:
             while self.is_running:
-                start_time = time.time()
+                start_time = time.monotonic()
                 
                 # 开始处理任务
                 self.load_reporter.start_task()
@@ -425,156 +591,160 @@ class DistributedWorkerNode:
                     )
                     
                     # 处理成功
-                    processing_time = time.time() - start_time
+                    processing_time = time.monotonic() - start_time
                     self.load_reporter.finish_task(processing_time, success=True)
+                    self.load_reporter.record_consumer_success()
+                    backoff = 1
                     
                 except Exception as e:
                     # 处理失败
-                    processing_time = time.time() - start_time
+                    processing_time = time.monotonic() - start_time
                     self.load_reporter.finish_task(processing_time, success=False)
-                    logger.error(f"❌ 故障处理失败: {fault_type.value} - {e}")
+                    self.load_reporter.record_consumer_failure()
+                    logger.error(f"❌ 故障处理失败: {fault_type.value} - {e} "
+                                 f"({backoff}s后重试)")
                     
-                    # 短暂休息后重试
-                    await asyncio.sleep(1)
+                    # 退避后重试（上限30秒）
+                    await asyncio.sleep(min(30, backoff) + random.random())
+                    backoff = min(30, backoff * 2)
                 
         except asyncio.CancelledError:
             logger.info(f"🛑 故障消费者停止: {consumer_id}")
         except Exception as e:
             logger.error(f"❌ 故障消费者异常: {consumer_id} - {e}")
     
-    async def _resource_monitoring_loop(self):
-        """资源监控循环"""
-        logger.info("📊 启动资源监控循环")
+    async def _unified_monitor_loop(self):
+        """
+        统一监控循环：每5秒一个tick，共享同一份资源指标
+        - 资源监控: 每2个tick (10秒)
+        - 负载报告: 每3个tick (15秒)
+        - 健康检查: 每6个tick (30秒)
+        """
+        logger.info("📊 启动统一监控循环（资源监控/负载报告/健康检查）")
         
+        tick = 0
         while self.is_running:
             try:
-                if self.config.resource_monitoring:
-                    # 获取系统资源指标
-                    metrics = self.resource_monitor.get_system_metrics()
-                    
-                    # 更新服务元数据
-                    if self.service_client:
-                        self.service_client.update_metadata({
-                            "cpu_usage": metrics.get("system_cpu_usage", 0),
-                            "memory_usage": metrics.get("system_memory_usage", 0),
-                            "healthy": metrics.get("healthy", True),
-                            "last_updated": metrics.get("timestamp", time.time())
-                        })
-                    
-                    # 检查资源使用是否过高
-                    if metrics.get("system_cpu_usage", 0) > 90:
-                        logger.warning(f"⚠️ CPU使用率过高: {metrics['system_cpu_usage']:.1f}%")
-                    
-                    if metrics.get("system_memory_usage", 0) > 85:
-                        logger.warning(f"⚠️ 内存使用率过高: {metrics['system_memory_usage']:.1f}%")
-                
-                await asyncio.sleep(10)  # 每10秒监控一次
+                metrics = await self.resource_monitor.get_system_metrics_async()
                 
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"❌ 资源监控异常: {e}")
-                await asyncio.sleep(5)
-    
-    async def _load_reporting_loop(self):
-        """负载报告循环"""
-        logger.info("📈 启动负载报告循环")
-        
-        while self.is_running:
-            try:
-                # 获取资源指标
-                resource_metrics = self.resource_monitor.get_system_metrics()
+                if tick % 2 == 0:
+                    self._monitor_resources(metrics)
                 
-                # 更新待处理消息数 (从Redis Stream获取)
-                await self._update_pending_messages()
+                if tick % 3 == 0:
+                    await self._report_load(metrics)
                 
-                # 发送负载报告
-                await self.load_reporter.report_load(resource_metrics)
+                if tick % 6 == 0:
+                    await self._check_health(metrics)
                 
-                await asyncio.sleep(15)  # 每15秒报告一次
+                tick += 1
+                await asyncio.sleep(5)
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"❌ 负载报告异常: {e}")
+                logger.error(f"❌ 监控循环异常: {e}")
+                tick += 1
                 await asyncio.sleep(5)
     
+    def _monitor_resources(self, metrics: Dict[str, Any]):
+        """资源监控：更新服务元数据并检查资源使用"""
+        if not self.config.resource_monitoring:
+            return
+        
+        # 更新本地服务元数据（持久化随负载报告管道一起发送）
+        if self.service_client:
+            self.service_client.update_metadata(self._resource_metadata(metrics))
+        
+        # 检查资源使用是否过高
+        if metrics.get("system_cpu_usage", 0) > 90:
+            logger.warning(f"⚠️ CPU使用率过高: {metrics['system_cpu_usage']:.1f}%")
+        
+        if metrics.get("system_memory_usage", 0) > 85:
+            logger.warning(f"⚠️ 内存使用率过高: {metrics['system_memory_usage']:.1f}%")
+    
+    def _resource_metadata(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """由资源指标构建服务元数据（current_load 供注册表按负载选择服务）"""
+        return {
+            "cpu_usage": metrics.get("system_cpu_usage", 0),
+            "memory_usage": metrics.get("system_memory_usage", 0),
+            "healthy": metrics.get("healthy", True),
+            "current_load": self.load_reporter.load_stats["current_tasks"] if self.load_reporter else 0,
+            "last_updated": metrics.get("timestamp", time.time())
+        }
+    
+    async def _report_load(self, metrics: Dict[str, Any]):
+        """负载报告：更新待处理消息数后发送报告"""
+        try:
+            # 更新待处理消息数 (从Redis Stream获取)
+            await self._update_pending_messages()
+            
+            # 发送负载报告，服务元数据写入合并进同一管道
+            extra_commands = None
+            if self.service_client and self.config.resource_monitoring:
+                metadata = self._resource_metadata(metrics)
+                extra_commands = lambda pipe: self.service_client.update_metadata_cmd(pipe, metadata)
+            await self.load_reporter.report_load(metrics, extra_commands)
+            
+        except Exception as e:
+            logger.error(f"❌ 负载报告异常: {e}")
+    
     async def _update_pending_messages(self):
         """更新待处理消息数量"""
         try:
             total_pending = 0
             
-            # 检查每个故障类型的消费者组待处理消息
-            for fault_type_str in self.config.fault_types:
-                if fault_type_str in self.fault_type_mapping:
-                    group_name = f"{fault_type_str}_diagnosis_group"
-                    
-                    try:
-                        # 获取消费者组信息 (需要Redis Stream支持)
-                        # 这里先使用模拟数据，实际需要从Redis Stream获取
-                        pending_count = await self._get_consumer_group_pending(group_name)
-                        total_pending += pending_count
-                        
-                    except Exception as e:
-                        logger.debug(f"获取{group_name}待处理消息失败: {e}")
+            group_names = self._active_group_names
+            if group_names:
+                # 一次 XINFO GROUPS 取回所有消费者组的 pending/lag 计数，无需逐组计算 XPENDING 摘要
+                try:
+                    groups_info = await self.redis_client.xinfo_groups("motor_raw_data")
+                except redis.ResponseError as e:
+                    # 流尚未创建
+                    logger.debug(f"获取消费者组信息失败: {e}")
+                    groups_info = []
+                
+                backlog = {
+                    group["name"]: self._group_backlog(group)
+                    for group in groups_info
+                    if group.get("name") in group_names
+                }
+                total_pending = sum(backlog.values())
             
             self.load_reporter.update_pending_messages(total_pending)
             
         except Exception as e:
             logger.error(f"❌ 更新待处理消息数失败: {e}")
     
-    async def _get_consumer_group_pending(self, group_name: str) -> int:
-        """获取消费者组待处理消息数"""
+    @staticmethod
+    def _group_backlog(group_info: Dict[str, Any]) -> int:
+        """消费者组积压量：已投递未确认(pending) + 尚未投递(lag，Redis 7+，不可确定时为nil)"""
+        return (group_info.get("pending") or 0) + (group_info.get("lag") or 0)
+    
+    async def _check_health(self, metrics: Dict[str, Any]):
+        """健康检查：Redis连接、诊断系统连接及资源状态"""
         try:
-            # 使用XPENDING命令获取待处理消息数
-            pending_info = await self.redis_client.xpending(
-                "motor_raw_data",  # Stream名称
-                group_name
-            )
+            # 检查Redis连接
+            await self.redis_client.ping()
             
-            if pending_info:
-                return pending_info[0]  # 总待处理消息数
+            # 检查诊断系统连接
+            if self.diagnosis_stream and self.diagnosis_stream.redis_client:
+                await self.diagnosis_stream.redis_client.ping()
             
-            return 0
+            # 检查资源状态
+            if not metrics.get("healthy", True):
+                logger.warning("⚠️ Worker节点资源状态不健康")
             
         except Exception as e:
-            logger.debug(f"获取消费者组待处理消息失败: {group_name} - {e}")
-            return 0
-    
-    async def _health_check_loop(self):
-        """健康检查循环"""
-        logger.info("💓 启动健康检查循环")
-        
-        while self.is_running:
-            try:
-                # 检查Redis连接
-                await self.redis_client.ping()
-                
-                # 检查诊断系统连接
-                if self.diagnosis_stream and self.diagnosis_stream.redis_client:
-                    await self.diagnosis_stream.redis_client.ping()
-                
-                # 检查资源状态
-                metrics = self.resource_monitor.get_system_metrics()
-                if not metrics.get("healthy", True):
-                    logger.warning("⚠️ Worker节点资源状态不健康")
-                
-                await asyncio.sleep(30)  # 每30秒检查一次
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"❌ 健康检查失败: {e}")
-                await asyncio.sleep(10)
+            logger.error(f"❌ 健康检查失败: {e}")
     
     async def get_worker_stats(self) -> Dict[str, Any]:
         """获取Worker统计信息"""
         try:
             current_time = time.time()
-            uptime = current_time - self.load_reporter.load_stats["start_time"]
+            uptime = time.monotonic() - self.load_reporter.load_stats["start_monotonic"]
             
             # 获取资源指标
-            resource_metrics = self.resource_monitor.get_system_metrics()
+            resource_metrics = await self.resource_monitor.get_system_metrics_async()
             
             # 获取负载统计
             load_stats = self.load_reporter.load_stats
@@ -10,26 +10,44 @@
 - 断条故障诊断
 """
 
-# 诊断算法函数导入（这些是函数式的诊断实现）
-from .turn_to_turn_diagnosis import *
-from .insulation_diagnosis import *
-from .bearing_diagnosis import *
-from .eccentricity_diagnosis import *
-from .broken_bar_diagnosis import *
+import importlib
+
+# 诊断算法函数按需导入（PEP 562）：只专注部分故障类型的Worker不必加载其余模块
+_LAZY = {
+    'analyze_turn_to_turn_fault': '.turn_to_turn_diagnosis',
+    'analyze_insulation_health': '.insulation_diagnosis',
+    'analyze_bearing_health': '.bearing_diagnosis',
+    'analyze_eccentricity_health': '.eccentricity_diagnosis',
+    'analyze_broken_bar_health': '.broken_bar_diagnosis',
+}
 
 __all__ = [
     # 匝间短路诊断
-    'diagnose_turn_to_turn_fault',
+    'analyze_turn_to_turn_fault',
     
     # 绝缘失效诊断
-    'diagnose_insulation_fault',
+    'analyze_insulation_health',
     
     # 轴承故障诊断
-    'diagnose_bearing_fault',
+    'analyze_bearing_health',
     
     # 偏心故障诊断
-    'diagnose_eccentricity_fault',
+    'analyze_eccentricity_health',
     
     # 断条故障诊断
-    'diagnose_broken_bar_fault'
-] 
\ No newline at end of file
+    'analyze_broken_bar_health'
+]
+
+
+def __getattr__(name):
+    """首次访问时导入对应诊断模块，并缓存到包命名空间"""
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """包含尚未加载的诊断入口函数"""
+    return sorted(set(globals()) | set(__all__))
@@ -1,13 +1,41 @@
 import numpy as np
 import pandas as pd
 from scipy import signal
-from scipy.fft import fft, fftfreq
+from scipy.fft import rfft, rfftfreq, set_backend
 import logging
 import math
+from contextlib import nullcontext
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, List, Any, Optional, Tuple
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    # 可选依赖：安装了pyFFTW时用其scipy.fft后端，并缓存FFTW计划供后续同长度变换复用
+    import pyfftw
+    import pyfftw.interfaces.scipy_fft as pyfftw_scipy_fft
+    pyfftw.interfaces.cache.enable()
+except ImportError:
+    pyfftw_scipy_fft = None
+
 logger = logging.getLogger(__name__)
 
+# 返回给前端绘图的时域点数及对应的采样序号（只读，按 1/fs 缩放即为时间轴）
+_TIME_SERIES_POINTS = 500
+_TIME_BASIS = np.arange(_TIME_SERIES_POINTS, dtype=np.float64)
+_TIME_BASIS.setflags(write=False)
+
+@lru_cache(maxsize=8)
+def _hann(n: int, dtype: type = np.float64) -> np.ndarray:
+    """按(长度, 精度)缓存的Hanning窗（只读）"""
+    window = np.hanning(n).astype(dtype)
+    window.setflags(write=False)
+    return window
+
 def calculate_spectrum(data: np.ndarray, fs: float) -> Tuple[np.ndarray, np.ndarray]:
     """
     计算信号的频谱
@@ -16,42 +44,87 @@ def calculate_spectrum(data: np.ndarray, fs: float) -> Tuple[np.ndarray, np.ndar
     :return: 频率和幅值
     """
     n = len(data)
+    
     # 应用汉宁窗减少频谱泄漏
-    window = np.hanning(n)
-    windowed_data = data * window
+    # 不补零到快速FFT长度：补零会改变频率网格，基波/边带幅值和THD随之偏移
+    # 单精度计算（rfft输出complex64），边带比例与THD只需约5位有效数字
+    windowed_data = data * _hann(n, np.float32)
     
-    # 计算FFT
-    yf = fft(windowed_data)
-    # 只取一半的频谱(由于共轭对称性)
+    # 实信号直接用rfft，只计算单边频谱(去掉奈奎斯特点，保持n//2点输出)
+    with set_backend(pyfftw_scipy_fft) if pyfftw_scipy_fft is not None else nullcontext():
+        yf = rfft(windowed_data, workers=-1)
     amplitude = 2.0/n * np.abs(yf[:n//2])
-    xf = fftfreq(n, 1/fs)[:n//2]
+    xf = rfftfreq(n, 1/fs)[:n//2]
     
     return xf, amplitude
 
-def extract_broken_bar_features(current_data: np.ndarray, fs: float, f_supply: float = None, rpm: float = None) -> Dict[str, float]:
+def _band_peak_index(freq: np.ndarray, amp: np.ndarray, f_low: float, f_high: float) -> Optional[int]:
+    """
+    闭区间[f_low, f_high]内幅值最大点的索引，区间内无频点时返回None
+    频率轴单调递增，用二分查找边界后直接切片，不生成整段布尔掩码
+    """
+    lo = int(np.searchsorted(freq, f_low, side='left'))
+    hi = int(np.searchsorted(freq, f_high, side='right'))
+    if hi <= lo:
+        return None
+    return lo + int(np.argmax(amp[lo:hi]))
+
+def _nearest_bins(freq: np.ndarray, target_freqs: np.ndarray) -> np.ndarray:
+    """
+    批量查找最接近各目标频率的频点索引
+    与逐个 np.argmin(np.abs(freq - f)) 结果相同（距离相等时取较低频点）
+    """
+    if len(freq) < 2:
+        return np.zeros(np.shape(target_freqs), dtype=np.intp)
+    target_freqs = np.asarray(target_freqs, dtype=np.float64)
+    right = np.clip(np.searchsorted(freq, target_freqs), 1, len(freq) - 1)
+    left = right - 1
+    return np.where(target_freqs - freq[left] <= freq[right] - target_freqs, left, right)
+
+def _nearest_bin(freq: np.ndarray, target_freq: float) -> int:
+    """最接近目标频率的频点索引"""
+    return int(_nearest_bins(freq, target_freq))
+
+# 边带比例分档阈值：<0.1为0条，<0.2为1条，<0.35为2条，其余按比例×10估计且最多5条
+_BB_RATIO_THRESHOLDS = np.array([0.1, 0.2, 0.35])
+_BB_MAX_COUNT = 5
+
+def _broken_bar_count(sideband_ratio):
+    """
+    根据边带比例估计断条数量，支持标量或数组（批量评估多台电机）
+    :param sideband_ratio: 边带比例
+    :return: 断条数量（标量输入返回int）
+    """
+    ratio = np.asarray(sideband_ratio, dtype=np.float64)
+    bucket = np.searchsorted(_BB_RATIO_THRESHOLDS, ratio, side='right')
+    counts = np.where(bucket < len(_BB_RATIO_THRESHOLDS), bucket, np.minimum(_BB_MAX_COUNT, np.round(ratio * 10)))
+    return int(counts) if counts.ndim == 0 else counts.astype(int)
+
+def extract_broken_bar_features(current_data: np.ndarray, fs: float, f_supply: float = None, rpm: float = None,
+                                spectrum: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict[str, float]:
     """
     从电流信号中提取断条故障特征
     :param current_data: 电流数据
     :param fs: 采样频率
     :param f_supply: 电源频率，如果未提供将从频谱中估计
     :param rpm: 电机转速(RPM)，如果未提供将从频谱中估计
+    :param spectrum: 已计算好的 calculate_spectrum 结果(频率, 幅值)，未提供时在此计算
     :return: 特征字典
     """
     # 计算频谱
-    freq, amp = calculate_spectrum(current_data, fs)
+    freq, amp = spectrum if spectrum is not None else calculate_spectrum(current_data, fs)
     
     # 如果未提供电源频率，从频谱中估计
     if f_supply is None:
         # 查找30-70Hz范围内的最大峰值作为电源频率
-        mask = (freq >= 30) & (freq <= 70)
-        if np.any(mask):
-            f_supply_idx = np.argmax(amp[mask]) + np.where(mask)[0][0]
+        f_supply_idx = _band_peak_index(freq, amp, 30, 70)
+        if f_supply_idx is not None:
             f_supply = freq[f_supply_idx]
         else:
             f_supply = 50.0  # 默认50Hz
     else:
         # 在频谱中找到最接近提供的电源频率的点
-        f_supply_idx = np.argmin(np.abs(freq - f_supply))
+        f_supply_idx = _nearest_bin(freq, f_supply)
     
     logger.info(f"电源频率: {f_supply} Hz")
     
@@ -77,27 +150,19 @@ def extract_broken_bar_features(current_data: np.ndarray, fs: float, f_supply: f
     # 确定搜索范围
     search_range = max(1.0, slip * f_supply)  # Hz
     
-    # 搜索下边带
-    lower_mask = (freq >= f_brokenbar_lower - search_range) & (freq <= f_brokenbar_lower + search_range)
-    if np.any(lower_mask):
-        lower_idx = np.argmax(amp[lower_mask]) + np.where(lower_mask)[0][0]
-        lower_freq = freq[lower_idx]
-        lower_amp = amp[lower_idx]
-    else:
-        lower_idx = np.argmin(np.abs(freq - f_brokenbar_lower))
-        lower_freq = freq[lower_idx]
-        lower_amp = amp[lower_idx]
+    # 搜索下边带（搜索范围内无频点时取最接近的频点）
+    lower_idx = _band_peak_index(freq, amp, f_brokenbar_lower - search_range, f_brokenbar_lower + search_range)
+    if lower_idx is None:
+        lower_idx = _nearest_bin(freq, f_brokenbar_lower)
+    lower_freq = freq[lower_idx]
+    lower_amp = amp[lower_idx]
     
     # 搜索上边带
-    upper_mask = (freq >= f_brokenbar_upper - search_range) & (freq <= f_brokenbar_upper + search_range)
-    if np.any(upper_mask):
-        upper_idx = np.argmax(amp[upper_mask]) + np.where(upper_mask)[0][0]
-        upper_freq = freq[upper_idx]
-        upper_amp = amp[upper_idx]
-    else:
-        upper_idx = np.argmin(np.abs(freq - f_brokenbar_upper))
-        upper_freq = freq[upper_idx]
-        upper_amp = amp[upper_idx]
+    upper_idx = _band_peak_index(freq, amp, f_brokenbar_upper - search_range, f_brokenbar_upper + search_range)
+    if upper_idx is None:
+        upper_idx = _nearest_bin(freq, f_brokenbar_upper)
+    upper_freq = freq[upper_idx]
+    upper_amp = amp[upper_idx]
     
     # 计算特征指标
     sideband_ratio = (lower_amp + upper_amp) / (2 * fundamental_amp) if fundamental_amp > 0 else 0
@@ -106,14 +171,7 @@ def extract_broken_bar_features(current_data: np.ndarray, fs: float, f_supply: f
     # 估计断条数量 - 使用更保守和合理的模型
     # 经验公式：根据幅值比估计断条数量
     # 注意：这只是一个简化的估计，实际数量还受电机特性、负载等因素影响
-    if sideband_ratio < 0.1:
-        broken_bar_count = 0
-    elif sideband_ratio < 0.2:
-        broken_bar_count = 1
-    elif sideband_ratio < 0.35:
-        broken_bar_count = 2
-    else:
-        broken_bar_count = min(5, int(round(sideband_ratio * 10)))  # 更保守的估计，最多5条
+    broken_bar_count = _broken_bar_count(sideband_ratio)
     
     # 收集特征参数
     features = {
@@ -130,9 +188,8 @@ def extract_broken_bar_features(current_data: np.ndarray, fs: float, f_supply: f
         "broken_bar_count": broken_bar_count
     }
     
-    # 附加时域特征
-    features["current_rms"] = np.sqrt(np.mean(current_data**2))
-    features["current_peak"] = np.max(np.abs(current_data))
+    # 附加时域特征（RMS与峰值一起计算，无中间数组）
+    features["current_rms"], features["current_peak"] = _rms_peak(current_data)
     features["current_crest_factor"] = features["current_peak"] / features["current_rms"] if features["current_rms"] > 0 else 0
     
     # 计算总谐波畸变率
@@ -141,6 +198,18 @@ def extract_broken_bar_features(current_data: np.ndarray, fs: float, f_supply: f
     
     return features
 
+def _rms_peak(data: np.ndarray) -> Tuple[float, float]:
+    """
+    电流信号的均方根值与峰值，不生成 data**2、abs(data) 临时数组
+    平方和用点积(BLAS)，峰值由最大/最小值得到
+    """
+    data = np.asarray(data)
+    if data.dtype.kind != 'f':
+        data = data.astype(np.float64)
+    rms = math.sqrt(float(np.dot(data, data)) / len(data))
+    peak = max(float(data.max()), -float(data.min()))
+    return rms, peak
+
 def calculate_thd(amp: np.ndarray, fundamental_idx: int, harmonics: int = 10) -> float:
     """
     计算总谐波畸变
@@ -156,14 +225,19 @@ def calculate_thd(amp: np.ndarray, fundamental_idx: int, harmonics: int = 10) ->
     if fundamental == 0:
         return 0
     
-    # 计算谐波幅值的平方和
-    harmonic_sum = 0
+    return float(_thd_kernel(amp, int(fundamental_idx), harmonics))
+
+def _thd_loop(amp: np.ndarray, fundamental_idx: int, harmonics: int) -> float:
+    """2~harmonics次谐波幅值平方和的平方根与基波幅值之比（调用方保证基波索引有效且幅值非零）"""
+    harmonic_sum = 0.0
     for h in range(2, harmonics + 1):
         h_idx = h * fundamental_idx
-        if h_idx < len(amp):
-            harmonic_sum += amp[h_idx] ** 2
-    
-    return np.sqrt(harmonic_sum) / fundamental
+        if h_idx < amp.shape[0]:
+            harmonic_sum += amp[h_idx] * amp[h_idx]
+    return math.sqrt(harmonic_sum) / amp[fundamental_idx]
+
+# 安装了numba时编译为机器码（可选依赖），否则直接以Python循环运行
+_thd_kernel = njit(cache=True)(_thd_loop) if njit is not None else _thd_loop
 
 def detect_slot_harmonics(freq: np.ndarray, amp: np.ndarray, f_supply: float, rpm: float, rotor_slots: int = 28) -> Dict[str, Dict[str, float]]:
     """
@@ -190,45 +264,91 @@ def detect_slot_harmonics(freq: np.ndarray, amp: np.ndarray, f_supply: float, rp
     first_slot_harmonic = f_supply * ((rotor_slots/poles)*(1-slip) - 1)
     second_slot_harmonic = f_supply * ((rotor_slots/poles)*(1-slip) - 3)
     
-    # 查找这些频率在频谱中的幅值
-    find_amplitude = lambda target_freq: amp[np.argmin(np.abs(freq - target_freq))]
+    harmonic_freqs = {
+        "principal_slot_harmonic": principal_slot_freq,
+        "upper_sideband": upper_sideband_freq,
+        "lower_sideband": lower_sideband_freq,
+        "first_slot_harmonic": first_slot_harmonic,
+        "second_slot_harmonic": second_slot_harmonic
+    }
     
-    # 查找电源频率的幅值作为参考
-    f_supply_amp = find_amplitude(f_supply)
+    # 一次查找电源频率（作为参考）和各槽谐波频率在频谱中的幅值
+    values = amp[_nearest_bins(freq, [f_supply, *harmonic_freqs.values()])]
+    f_supply_amp = values[0]
     
     # 计算相对幅值
-    get_relative_amp = lambda target_freq: find_amplitude(target_freq) / f_supply_amp if f_supply_amp > 0 else 0
+    relative_amps = values[1:] / f_supply_amp if f_supply_amp > 0 else np.zeros(len(harmonic_freqs))
     
     slot_harmonics = {
-        "principal_slot_harmonic": {
-            "frequency": float(principal_slot_freq),
-            "amplitude": float(get_relative_amp(principal_slot_freq)),
+        name: {
+            "frequency": float(target_freq),
+            "amplitude": float(relative_amp),
             "phase": 0.0  # 相位信息需要更复杂的计算
-        },
-        "upper_sideband": {
-            "frequency": float(upper_sideband_freq),
-            "amplitude": float(get_relative_amp(upper_sideband_freq)),
-            "phase": 0.0
-        },
-        "lower_sideband": {
-            "frequency": float(lower_sideband_freq),
-            "amplitude": float(get_relative_amp(lower_sideband_freq)),
-            "phase": 0.0
-        },
-        "first_slot_harmonic": {
-            "frequency": float(first_slot_harmonic),
-            "amplitude": float(get_relative_amp(first_slot_harmonic)),
-            "phase": 0.0
-        },
-        "second_slot_harmonic": {
-            "frequency": float(second_slot_harmonic),
-            "amplitude": float(get_relative_amp(second_slot_harmonic)),
-            "phase": 0.0
         }
+        for (name, target_freq), relative_amp in zip(harmonic_freqs.items(), relative_amps)
     }
     
     return slot_harmonics
 
+def _max_pool(freq: np.ndarray, amp: np.ndarray, step: int) -> Tuple[np.ndarray, np.ndarray]:
+    """每step个频点保留幅值最大的一个（保留峰值及其真实频率）"""
+    if step <= 1 or len(amp) == 0:
+        return freq, amp
+    blocks = -(-len(amp) // step)
+    padded = np.full(blocks * step, -np.inf)
+    padded[:len(amp)] = amp
+    idx = np.argmax(padded.reshape(blocks, step), axis=1) + np.arange(0, blocks * step, step)
+    return freq[idx], amp[idx]
+
+def _display_spectrum(freq: np.ndarray, amp: np.ndarray, keep_low: float, keep_high: float,
+                      max_points: int = 2000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    前端绘图用频谱：[keep_low, keep_high]（电源频率与边带，边带放大视图需要）保持原分辨率，
+    其余频段按最大值池化，总点数约为max_points
+    """
+    if len(freq) <= max_points:
+        return freq, amp
+    lo = int(np.searchsorted(freq, keep_low, side='left'))
+    hi = int(np.searchsorted(freq, keep_high, side='right'))
+    step = -(-(len(freq) - (hi - lo)) // max_points)
+    low_freq, low_amp = _max_pool(freq[:lo], amp[:lo], step)
+    high_freq, high_amp = _max_pool(freq[hi:], amp[hi:], step)
+    return (np.concatenate([low_freq, freq[lo:hi], high_freq]),
+            np.concatenate([low_amp, amp[lo:hi], high_amp]))
+
+# 诊断失败时返回结果的固定部分
+_ERROR_SUGGESTIONS = ("请检查数据质量并重新尝试分析", "确保数据包含足够的电流样本", "验证电机参数是否正确")
+_ERROR_RESULT_TEMPLATE = MappingProxyType({
+    "status": "error",
+    "score": 0.0,
+    "broken_bar_count": 0,
+    "confidence": 0.0,
+})
+
+# 电流列别名（小写比较）
+_CURRENT_ALIASES = frozenset(('ia', 'current_a', 'i_a'))
+
+def _find_current_column(columns: pd.Index) -> Optional[str]:
+    """
+    查找电流列，优先级：'current' > 'Ia' > 别名(不区分大小写) > 列名包含'curr'的第一列
+    单次遍历，每个列名只转换一次小写
+    """
+    if 'current' in columns:
+        return 'current'
+    if 'Ia' in columns:
+        return 'Ia'
+    curr_col = None
+    for col in columns:
+        if not isinstance(col, str):
+            continue
+        lower = col.lower()
+        if lower in _CURRENT_ALIASES:
+            return col
+        if curr_col is None and 'curr' in lower:
+            # 看起来像是电流的列作为候选，仅在没有别名列时使用
+            curr_col = col
+    return curr_col
+
 def analyze_broken_bar_health(df: pd.DataFrame) -> Dict[str, Any]:
     """
     分析电机断条健康状态
@@ -239,16 +359,21 @@ def analyze_broken_bar_health(df: pd.DataFrame) -> Dict[str, Any]:
         # 确定采样频率
         if 'timestamp' in df.columns and len(df) > 1:
             try:
-                # 尝试将时间戳转换为时间差，计算平均采样周期
-                if isinstance(df['timestamp'].iloc[0], str):
-                    df['temp_time'] = pd.to_datetime(df['timestamp'])
-                    time_diff = df['temp_time'].diff().dropna()
-                    avg_period = time_diff.mean().total_seconds()
+                # 平均采样周期 = (末 - 首) / (n - 1)，与逐点差分的均值相同，无需生成差分序列
+                timestamps = df['timestamp']
+                if isinstance(timestamps.iloc[0], str):
+                    # 字符串时间戳只需解析首尾两个
+                    ends = pd.to_datetime(timestamps.iloc[[0, -1]])
+                    avg_period = (ends.iloc[1] - ends.iloc[0]).total_seconds() / (len(timestamps) - 1)
+                    if pd.isna(avg_period):
+                        # 首尾缺失时退回逐点差分均值
+                        avg_period = pd.to_datetime(timestamps).diff().dropna().mean().total_seconds()
                     fs = 1.0 / avg_period if avg_period > 0 else 10000.0  # 默认10kHz
                 else:
                     # 如果时间戳不是字符串，假设它是数字
-                    time_diff = df['timestamp'].diff().dropna()
-                    avg_period = time_diff.mean()
+                    avg_period = (timestamps.iloc[-1] - timestamps.iloc[0]) / (len(timestamps) - 1)
+                    if pd.isna(avg_period):
+                        avg_period = timestamps.diff().dropna().mean()
                     fs = 1.0 / avg_period if avg_period > 0 else 10000.0
             except Exception as e:
                 logger.warning(f"从时间戳推断采样率失败: {str(e)}")
@@ -269,31 +394,24 @@ def analyze_broken_bar_health(df: pd.DataFrame) -> Dict[str, Any]:
             rpm = df['rpm'].mean()
         
         # 获取电流数据
-        current_data = None
-        if 'current' in df.columns:
-            current_data = df['current'].values
-        elif 'Ia' in df.columns:
-            current_data = df['Ia'].values
-        elif any(col.lower() in ['ia', 'current_a', 'i_a'] for col in df.columns):
-            current_col = next(col for col in df.columns if col.lower() in ['ia', 'current_a', 'i_a'])
-            current_data = df[current_col].values
-        else:
-            # 尝试查找任何看起来像是电流的列
-            current_columns = [col for col in df.columns if 'curr' in col.lower()]
-            if current_columns:
-                current_data = df[current_columns[0]].values
-        
-        if current_data is None:
+        current_col = _find_current_column(df.columns)
+        if current_col is None:
             raise ValueError("无法在数据中找到电流列")
+        raw_current = df[current_col].values
+        
+        # 预处理电流数据 - 移除直流偏置（复制为单精度后原地相减，不修改df、不再分配第二个数组）
+        # 偏置按原始精度求一次，返回的时域示例由原始列减去同一偏置得到，不带单精度舍入误差
+        dc_offset = raw_current.mean()
+        current_data = np.array(raw_current, dtype=np.float32)
+        current_data -= dc_offset
         
-        # 预处理电流数据 - 移除直流偏置
-        current_data = current_data - np.mean(current_data)
+        # 频谱只计算一次，断条特征与转子槽谐波分析共用
+        freq, amp = calculate_spectrum(current_data, fs)
         
         # 提取断条故障特征
-        features = extract_broken_bar_features(current_data, fs, f_supply, rpm)
+        features = extract_broken_bar_features(current_data, fs, f_supply, rpm, spectrum=(freq, amp))
         
         # 增加转子槽谐波分析
-        freq, amp = calculate_spectrum(current_data, fs)
         slot_harmonics = detect_slot_harmonics(freq, amp, features['power_supply_freq'], features['rotor_speed'])
         features['slot_harmonics'] = slot_harmonics
         
@@ -334,8 +452,15 @@ def analyze_broken_bar_health(df: pd.DataFrame) -> Dict[str, Any]:
         
         # 准备时域数据用于前端绘图
         time_step = 1/fs
-        time_points = np.arange(min(500, len(current_data))) * time_step
-        time_values = current_data[:min(500, len(current_data))]
+        k = min(_TIME_SERIES_POINTS, len(current_data))
+        time_points = _TIME_BASIS[:k] * time_step
+        time_values = raw_current[:k] - dc_offset
+        
+        # 返回给前端的频谱：边带附近保持原分辨率，其余频段降采样，避免上万点的列表
+        display_freq, display_amp = _display_spectrum(
+            freq, amp,
+            features['left_sideband_freq'] - 5.0, features['right_sideband_freq'] + 5.0
+        )
         
         # 组装结果
         result = {
@@ -349,8 +474,8 @@ def analyze_broken_bar_health(df: pd.DataFrame) -> Dict[str, Any]:
                 "values": time_values.tolist()
             },
             "frequency_spectrum": {
-                "frequency": freq.tolist(),
-                "amplitude": amp.tolist()
+                "frequency": display_freq.tolist(),
+                "amplitude": display_amp.tolist()
             },
             "diagnosis_conclusion": diagnosis_conclusion,
             "suggestions": suggestions
@@ -360,18 +485,14 @@ def analyze_broken_bar_health(df: pd.DataFrame) -> Dict[str, Any]:
         
     except Exception as e:
         logger.exception(f"断条故障诊断分析失败: {str(e)}")
-        # 返回错误结果
-        return {
-            "status": "error",
-            "score": 0.0,
-            "broken_bar_count": 0,
-            "confidence": 0.0,
-            "features": {},
-            "time_series": {"time": [], "values": []},
-            "frequency_spectrum": {"frequency": [], "amplitude": []},
-            "diagnosis_conclusion": f"诊断过程中发生错误: {str(e)}",
-            "suggestions": ["请检查数据质量并重新尝试分析", "确保数据包含足够的电流样本", "验证电机参数是否正确"]
-        }
+        # 返回错误结果：不可变字段来自模板，容器每次新建（调用方可能修改或直接json序列化结果）
+        result = dict(_ERROR_RESULT_TEMPLATE)
+        result["features"] = {}
+        result["time_series"] = {"time": [], "values": []}
+        result["frequency_spectrum"] = {"frequency": [], "amplitude": []}
+        result["diagnosis_conclusion"] = f"诊断过程中发生错误: {str(e)}"
+        result["suggestions"] = list(_ERROR_SUGGESTIONS)
+        return result
 
 def generate_diagnosis_conclusion(status: str, features: Dict[str, Any]) -> str:
     """
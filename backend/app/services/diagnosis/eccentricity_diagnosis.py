@@ -1,84 +1,128 @@
 import numpy as np
 import pandas as pd
 from scipy import signal
-from scipy.fft import fft, fftfreq
+from scipy.fft import rfft, irfft, rfftfreq
 import logging
 import math
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
-def calculate_spectrum(data: np.ndarray, fs: float) -> Tuple[np.ndarray, np.ndarray]:
+# 偏心特征边带 f_s ± k*f_r 的阶次k（只读）
+_SIDEBAND_ORDERS = np.array([1, 2, 3])
+_SIDEBAND_ORDERS.setflags(write=False)
+
+@lru_cache(maxsize=8)
+def _hann(n: int, dtype: type = np.float64) -> np.ndarray:
+    """按(长度, 精度)缓存的Hanning窗（只读）"""
+    window = np.hanning(n).astype(dtype)
+    window.setflags(write=False)
+    return window
+
+def calculate_spectrum(data: np.ndarray, fs: float, overwrite_data: bool = False) -> Tuple[np.ndarray, np.ndarray]:
     """
     计算信号的频谱
-    :param data: 时域信号
+    :param data: 时域信号，可以是一维信号或按行堆叠的多通道信号 (沿最后一维计算)
     :param fs: 采样频率
-    :return: 频率和幅值
+    :param overwrite_data: 为True时直接在data上原地加窗 (调用方之后不再使用data)，省去一次整段信号的分配
+    :return: 频率和幅值 (多通道输入时幅值为二维数组，每行对应一个通道)
     """
-    n = len(data)
-    # 应用汉宁窗减少频谱泄漏
-    window = np.hanning(n)
-    windowed_data = data * window
+    n = data.shape[-1]
+    
+    # 应用汉宁窗减少频谱泄漏 (单精度输入使用单精度窗，rfft输出complex64)
+    window = _hann(n, np.float32 if data.dtype == np.float32 else np.float64)
+    windowed_data = np.multiply(data, window, out=data) if overwrite_data else data * window
     
-    # 计算FFT
-    yf = fft(windowed_data)
+    # 实数输入使用rfft，多通道时一次批量计算。不补零到快速FFT长度：
+    # 补零会改变频率网格，边带取最近频点时幅值随之变化，进而改变偏心类型判断
+    yf = rfft(windowed_data, axis=-1, workers=-1)
     # 只取一半的频谱(由于共轭对称性)
-    amplitude = 2.0/n * np.abs(yf[:n//2])
-    xf = fftfreq(n, 1/fs)[:n//2]
+    amplitude = 2.0/n * np.abs(yf[..., :n//2])
+    xf = rfftfreq(n, 1/fs)[:n//2]
     
     return xf, amplitude
 
-def extract_current_features(current_data: np.ndarray, fs: float, f_supply: float, rpm: float) -> Dict[str, float]:
+def _spectrum_payload(freq: np.ndarray, amp: np.ndarray, f_max: Optional[float] = None) -> Dict[str, List[float]]:
+    """
+    生成返回结果中的频谱字典
+    :param freq: 频率数组 (升序)
+    :param amp: 幅值数组
+    :param f_max: 保留的最高频率；指定时截取0~f_max并取整以减小返回体积，为None时返回完整频谱
+    :return: {'frequency': [...], 'amplitude': [...]}
+    """
+    if f_max is None:
+        return {'frequency': freq.tolist(), 'amplitude': amp.tolist()}
+    cut = int(np.searchsorted(freq, f_max, side='right'))
+    return {'frequency': freq[:cut].round(3).tolist(), 'amplitude': amp[:cut].round(6).tolist()}
+
+def _nearest_bin(freq: np.ndarray, target: float) -> int:
+    """
+    在均匀频率网格上直接由频率分辨率换算最接近目标频率的索引
+    :param freq: 频率数组 (从0开始、等间隔)
+    :param target: 目标频率
+    :return: 索引 (截断到有效范围内；目标恰在两频点正中时取较低频点，与 argmin 一致)
+    """
+    idx = math.ceil(target / freq[1] - 0.5)
+    return min(max(idx, 0), len(freq) - 1)
+
+def _nearest_bins(freq: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """_nearest_bin 的批量版本：一次换算多个目标频率的索引"""
+    return np.clip(np.ceil(targets / freq[1] - 0.5), 0, len(freq) - 1).astype(np.intp)
+
+def extract_current_features(current_data: np.ndarray, fs: float, f_supply: float, rpm: float,
+                             spectrum: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Tuple[Tuple[str, ...], np.ndarray]:
     """
     从电流信号中提取偏心故障特征
     :param current_data: 电流数据
     :param fs: 采样频率
     :param f_supply: 电源频率
     :param rpm: 电机转速(RPM)
-    :return: 特征字典
+    :param spectrum: 已计算好的(频率, 幅值)，为空时在此计算
+    :return: 特征名元组和按相同顺序排列的特征值数组 (便于多相特征直接做数组运算)
     """
     # 转换转速为转子频率
     f_rotor = rpm / 60.0  # Hz
     
     # 计算频谱
-    freq, amp = calculate_spectrum(current_data, fs)
+    if spectrum is None:
+        spectrum = calculate_spectrum(current_data, fs)
+    freq, amp = spectrum
     
-    # 归一化频谱，使基波幅值为1
-    f_supply_idx = np.argmin(np.abs(freq - f_supply))
+    # 基波幅值，特征边带幅值按其归一化 (基波为1)
+    f_supply_idx = _nearest_bin(freq, f_supply)
     fundamental_amp = amp[f_supply_idx]
-    normalized_amp = amp / fundamental_amp if fundamental_amp > 0 else amp
     
-    # 特征字典
-    features = {}
+    # 查找特征频率分量 f_s ± k*f_r，通常考虑k=1,2,3：上下边带一次换算索引、一次取出幅值，
+    # 只对取出的边带幅值做归一化，不再归一化整个频谱
+    k_values = _SIDEBAND_ORDERS
+    f_ecc = f_supply + np.concatenate([-k_values, k_values]) * f_rotor
+    idx = _nearest_bins(freq, f_ecc)
+    sideband_amp = amp[idx] / fundamental_amp if fundamental_amp > 0 else amp[idx]
+    lower, upper = sideband_amp[:len(k_values)], sideband_amp[len(k_values):]
+    sideband_avg = (lower + upper) / 2
+    sideband_diff = np.abs(lower - upper)
     
-    # 查找特征频率分量 f_s ± k*f_r
-    k_values = [1, 2, 3]  # 通常考虑k=1,2,3
-    for k in k_values:
-        # 侧边带频率
-        f_ecc_lower = f_supply - k * f_rotor
-        f_ecc_upper = f_supply + k * f_rotor
-        
-        # 查找最接近的频率点
-        idx_lower = np.argmin(np.abs(freq - f_ecc_lower))
-        idx_upper = np.argmin(np.abs(freq - f_ecc_upper))
-        
-        # 确保查找到的频率在合理范围内
-        if abs(freq[idx_lower] - f_ecc_lower) > 0.5 or abs(freq[idx_upper] - f_ecc_upper) > 0.5:
-            logger.warning(f"频率分辨率不足，无法准确定位k={k}的特征频率")
-        
-        # 记录特征频率的幅值
-        features[f'lower_sideband_k{k}'] = normalized_amp[idx_lower]
-        features[f'upper_sideband_k{k}'] = normalized_amp[idx_upper]
-        features[f'sideband_avg_k{k}'] = (normalized_amp[idx_lower] + normalized_amp[idx_upper]) / 2
-        features[f'sideband_diff_k{k}'] = abs(normalized_amp[idx_lower] - normalized_amp[idx_upper])
+    # 确保查找到的频率在合理范围内
+    off_grid = (np.abs(freq[idx] - f_ecc) > 0.5).reshape(2, -1).any(axis=0)
+    for k in k_values[off_grid]:
+        logger.warning(f"频率分辨率不足，无法准确定位k={k}的特征频率")
+    
+    # 记录特征频率的幅值
+    features = {}
+    for i, k in enumerate(k_values.tolist()):
+        features[f'lower_sideband_k{k}'] = lower[i]
+        features[f'upper_sideband_k{k}'] = upper[i]
+        features[f'sideband_avg_k{k}'] = sideband_avg[i]
+        features[f'sideband_diff_k{k}'] = sideband_diff[i]
     
     # 计算偏心严重程度指标
-    features['eccentricity_index'] = (features['sideband_avg_k1'] + 0.5*features['sideband_avg_k2'] + 0.25*features['sideband_avg_k3']) / 1.75
+    features['eccentricity_index'] = (sideband_avg[0] + 0.5*sideband_avg[1] + 0.25*sideband_avg[2]) / 1.75
     
     # 计算静态/动态偏心比例指标
     # 通常静态偏心会导致上下边带不对称，而动态偏心更对称
-    static_weight = np.mean([features[f'sideband_diff_k{k}'] for k in k_values])
-    dynamic_weight = np.mean([features[f'sideband_avg_k{k}'] for k in k_values]) - static_weight
+    static_weight = sideband_diff.mean()
+    dynamic_weight = sideband_avg.mean() - static_weight
     total_weight = static_weight + dynamic_weight
     
     if total_weight > 0:
@@ -94,7 +138,7 @@ def extract_current_features(current_data: np.ndarray, fs: float, f_supply: floa
     features['current_crest_factor'] = features['current_peak'] / features['current_rms'] if features['current_rms'] > 0 else 0
     features['current_thd'] = calculate_thd(amp, f_supply_idx)
     
-    return features
+    return tuple(features), np.fromiter(features.values(), dtype=np.float64, count=len(features))
 
 def calculate_thd(amp: np.ndarray, fundamental_idx: int, harmonics: int = 10) -> float:
     """
@@ -111,43 +155,51 @@ def calculate_thd(amp: np.ndarray, fundamental_idx: int, harmonics: int = 10) ->
     if fundamental == 0:
         return 0
     
-    # 计算谐波幅值的平方和
-    harmonic_sum = 0
-    for h in range(2, harmonics + 1):
-        h_idx = fundamental_idx * h
-        if h_idx < len(amp):
-            harmonic_sum += amp[h_idx] ** 2
+    # 一次取出所有在频谱范围内的谐波幅值，计算其平方和的平方根
+    h_idx = fundamental_idx * np.arange(2, harmonics + 1)
+    h_idx = h_idx[h_idx < len(amp)]
     
-    return np.sqrt(harmonic_sum) / fundamental
+    return np.linalg.norm(amp[h_idx]) / fundamental
+
+@lru_cache(maxsize=32)
+def _bp_sos(fs: float, f_supply: float) -> np.ndarray:
+    """电源频率±10Hz的4阶Butterworth带通滤波器（二阶节形式，数值上比(b, a)多项式更稳定）"""
+    return signal.butter(4, [f_supply - 10, f_supply + 10], btype='band', fs=fs, output='sos')
+
+def _envelope(x: np.ndarray) -> np.ndarray:
+    """
+    实信号的包络 |x + jH{x}|
+    希尔伯特变换在正频率上等于乘以 -j，直流和奈奎斯特分量的虚部在 irfft 中被舍去，
+    结果与 np.abs(signal.hilbert(x)) 一致，但只需一对实数FFT，也不生成完整的复解析信号
+    """
+    hx = irfft(-1j * rfft(x, workers=-1), n=x.shape[-1], workers=-1)
+    # 包络直接写回希尔伯特变换的缓冲区
+    return np.hypot(x, hx, out=hx)
 
-def perform_envelope_analysis(current_data: np.ndarray, fs: float, f_supply: float) -> Dict[str, np.ndarray]:
+def perform_envelope_analysis(current_data: np.ndarray, fs: float, f_supply: float,
+                              spectrum_max_harmonic: Optional[float] = None) -> Dict[str, np.ndarray]:
     """
     执行包络分析，用于检测偏心故障
     :param current_data: 电流数据
     :param fs: 采样频率
     :param f_supply: 电源频率
+    :param spectrum_max_harmonic: 指定时包络谱只保留到电源频率的该倍数并取整，为None时返回完整包络谱
     :return: 包络频谱
     """
-    # 设计一个带通滤波器，中心在电源频率附近
-    nyquist = fs / 2
-    low = (f_supply - 10) / nyquist
-    high = (f_supply + 10) / nyquist
-    b, a = signal.butter(4, [low, high], btype='band')
-    
-    # 应用滤波器
-    filtered_data = signal.filtfilt(b, a, current_data)
+    # 带通滤波，中心在电源频率附近 (二阶节零相位滤波)
+    filtered_data = signal.sosfiltfilt(_bp_sos(fs, f_supply), current_data)
     
-    # 计算希尔伯特变换得到包络
-    analytic_signal = signal.hilbert(filtered_data)
-    envelope = np.abs(analytic_signal)
+    # 由希尔伯特变换得到包络
+    envelope = _envelope(filtered_data)
     
-    # 去除直流分量
-    envelope = envelope - np.mean(envelope)
+    # 去除直流分量 (包络是新分配的数组，原地相减并原地加窗)
+    envelope -= envelope.mean()
     
     # 计算包络谱
-    env_freq, env_amp = calculate_spectrum(envelope, fs)
+    env_freq, env_amp = calculate_spectrum(envelope, fs, overwrite_data=True)
     
-    return {'frequency': env_freq.tolist(), 'amplitude': env_amp.tolist()}
+    f_max = spectrum_max_harmonic * f_supply if spectrum_max_harmonic is not None else None
+    return _spectrum_payload(env_freq, env_amp, f_max)
 
 def detect_eccentricity_type(features: Dict[str, float]) -> Tuple[str, float]:
     """
@@ -173,26 +225,33 @@ def detect_eccentricity_type(features: Dict[str, float]) -> Tuple[str, float]:
     else:
         return "mixed", max(static_ratio, dynamic_ratio)
 
-def analyze_eccentricity_health(df: pd.DataFrame) -> Dict[str, Any]:
+def analyze_eccentricity_health(df: pd.DataFrame, spectrum_max_harmonic: Optional[float] = None) -> Dict[str, Any]:
     """
     分析电机的偏心健康状态
     :param df: 包含电机数据的DataFrame
+    :param spectrum_max_harmonic: 指定时返回的频谱/包络谱只保留到电源频率的该倍数并取整以减小返回体积
+                                  (如5倍即可覆盖偏心边带与低次谐波)，默认None返回完整频谱
     :return: 诊断结果
     """
     try:
         # 确定采样频率 (从时间戳推断)
         if 'timestamp' in df.columns and len(df) > 1:
             try:
-                # 尝试将时间戳转换为时间差，计算平均采样周期
-                if isinstance(df['timestamp'].iloc[0], str):
-                    df['temp_time'] = pd.to_datetime(df['timestamp'])
-                    time_diff = df['temp_time'].diff().dropna()
-                    avg_period = time_diff.mean().total_seconds()
+                # 平均采样周期 = (末 - 首) / (n - 1)，与逐点差分的均值相同，无需生成差分序列
+                timestamps = df['timestamp']
+                if isinstance(timestamps.iloc[0], str):
+                    # 字符串时间戳只需解析首尾两个
+                    ends = pd.to_datetime(timestamps.iloc[[0, -1]])
+                    avg_period = (ends.iloc[1] - ends.iloc[0]).total_seconds() / (len(timestamps) - 1)
+                    if pd.isna(avg_period):
+                        # 首尾缺失时退回逐点差分均值
+                        avg_period = pd.to_datetime(timestamps).diff().dropna().mean().total_seconds()
                     fs = 1.0 / avg_period if avg_period > 0 else 1000.0  # 默认1kHz
                 else:
                     # 如果时间戳不是字符串，假设它是数字
-                    time_diff = df['timestamp'].diff().dropna()
-                    avg_period = time_diff.mean()
+                    avg_period = (timestamps.iloc[-1] - timestamps.iloc[0]) / (len(timestamps) - 1)
+                    if pd.isna(avg_period):
+                        avg_period = timestamps.diff().dropna().mean()
                     fs = 1.0 / avg_period if avg_period > 0 else 1000.0
             except Exception as e:
                 logger.warning(f"从时间戳推断采样率失败: {str(e)}")
@@ -242,26 +301,33 @@ def analyze_eccentricity_health(df: pd.DataFrame) -> Dict[str, Any]:
         if len(current_a) < 100:
             raise ValueError(f"数据点数不足: {len(current_a)} < 100")
         
+        # 返回的时域示例取自原始A相列，不带单精度舍入误差
+        original_a = current_a
+        
+        # 三相电流堆叠为单精度数组后一次计算频谱：频谱、包络链路受内存带宽限制，
+        # 边带比例和电流幅值特征只需约5位有效数字
+        phases = np.vstack([current_a, current_b, current_c], dtype=np.float32)
+        current_a, current_b, current_c = phases
+        phase_freq, phase_amp = calculate_spectrum(phases, fs)
+        
         # 提取特征
-        features_a = extract_current_features(current_a, fs, f_supply, rpm)
-        features_b = extract_current_features(current_b, fs, f_supply, rpm)
-        features_c = extract_current_features(current_c, fs, f_supply, rpm)
+        feature_keys, values_a = extract_current_features(current_a, fs, f_supply, rpm, spectrum=(phase_freq, phase_amp[0]))
+        _, values_b = extract_current_features(current_b, fs, f_supply, rpm, spectrum=(phase_freq, phase_amp[1]))
+        _, values_c = extract_current_features(current_c, fs, f_supply, rpm, spectrum=(phase_freq, phase_amp[2]))
         
         # 综合三相特征 (取平均)
-        features = {}
-        for key in features_a.keys():
-            features[key] = (features_a[key] + features_b[key] + features_c[key]) / 3
+        features = dict(zip(feature_keys, ((values_a + values_b + values_c) / 3).tolist()))
         
         # 执行包络分析 (主要使用A相)
-        envelope_spectrum = perform_envelope_analysis(current_a, fs, f_supply)
+        envelope_spectrum = perform_envelope_analysis(current_a, fs, f_supply, spectrum_max_harmonic)
         
-        # 计算频谱
-        freq_a, amp_a = calculate_spectrum(current_a, fs)
+        # 返回的频谱直接复用已批量计算的A相频谱
+        freq_a, amp_a = phase_freq, phase_amp[0]
         
         # 制作时域数据示例 (采样100个点)
         time_step = 1/fs
         time_points = np.arange(min(100, len(current_a))) * time_step
-        time_series_a = current_a[:min(100, len(current_a))]
+        time_series_a = original_a[:min(100, len(original_a))]
         
         # 偏心类型检测
         ecc_type, confidence = detect_eccentricity_type(features)
@@ -305,10 +371,9 @@ def analyze_eccentricity_health(df: pd.DataFrame) -> Dict[str, Any]:
                 "time": time_points.tolist(),
                 "values": time_series_a.tolist()
             },
-            "frequency_spectrum": {
-                "frequency": freq_a.tolist(),
-                "amplitude": amp_a.tolist()
-            },
+            "frequency_spectrum": _spectrum_payload(
+                freq_a, amp_a, spectrum_max_harmonic * f_supply if spectrum_max_harmonic is not None else None
+            ),
             "envelope_spectrum": envelope_spectrum,
             "diagnosis_conclusion": conclusion,
             "suggestions": suggestions
@@ -332,6 +397,33 @@ def analyze_eccentricity_health(df: pd.DataFrame) -> Dict[str, Any]:
             "suggestions": ["请检查数据质量并重新尝试分析", "确保数据包含足够的电流样本", "验证电机参数是否正确"]
         }
 
+_CONCLUSION_NORMAL = "电机运行状态良好，未检测到明显的偏心故障特征。监测指标在正常范围内，电流频谱中的特征边带幅值较低。"
+
+# 各偏心类型的结论模板 (未识别的类型按混合偏心描述)
+_CONCLUSION_TYPE_TEMPLATES = {
+    "static": "电机存在{severity_text}静态偏心故障，特征指数为{severity:.2f}。静态偏心通常由定子和转子中心不同心引起，可能是由于安装不当、轴承座磨损或定子变形导致。",
+    "dynamic": "电机存在{severity_text}动态偏心故障，特征指数为{severity:.2f}。动态偏心通常由转子旋转中心偏离几何中心引起，可能是转子弯曲、轴承磨损或转子动平衡问题导致。",
+    "mixed": (
+        "电机存在{severity_text}混合偏心故障，特征指数为{severity:.2f}。检测到同时存在静态偏心({static_ratio:.2f})和动态偏心({dynamic_ratio:.2f})特征。"
+        "混合偏心通常表明机械问题较为复杂，可能同时存在多种故障原因。"
+    ),
+}
+
+# 单一类型偏心占比超过0.8时的补充说明：(占比特征名, 模板)
+_CONCLUSION_DOMINANT = {
+    "static": ("static_ecc_ratio", "静态偏心占比高达{ratio:.2f}，几乎不存在动态偏心成分。"),
+    "dynamic": ("dynamic_ecc_ratio", "动态偏心占比高达{ratio:.2f}，几乎不存在静态偏心成分。"),
+}
+
+_CONCLUSION_STATUS_SUFFIX = {
+    "warning": "该级别的偏心可能导致轻微振动增加、效率下降和寿命缩短，建议在计划维护时关注。",
+    "fault": "该级别的偏心会显著增加电机振动、噪声，降低效率，并可能导致定子-转子摩擦或轴承加速损坏，应尽快安排检修。",
+}
+
+def _ecc_type_key(ecc_type: str) -> str:
+    """结论和建议表的类型键：静态、动态之外的类型都按混合偏心处理"""
+    return ecc_type if ecc_type in ("static", "dynamic") else "mixed"
+
 def generate_diagnosis_conclusion(status: str, ecc_type: str, severity: float, features: Dict[str, float]) -> str:
     """
     生成诊断结论
@@ -342,29 +434,81 @@ def generate_diagnosis_conclusion(status: str, ecc_type: str, severity: float, f
     :return: 诊断结论文本
     """
     if status == "normal":
-        return "电机运行状态良好，未检测到明显的偏心故障特征。监测指标在正常范围内，电流频谱中的特征边带幅值较低。"
+        return _CONCLUSION_NORMAL
     
     severity_text = "轻微" if severity < 0.4 else ("中度" if severity < 0.7 else "严重")
+    type_key = _ecc_type_key(ecc_type)
     
-    if ecc_type == "static":
-        conclusion = f"电机存在{severity_text}静态偏心故障，特征指数为{severity:.2f}。静态偏心通常由定子和转子中心不同心引起，可能是由于安装不当、轴承座磨损或定子变形导致。"
-        if features['static_ecc_ratio'] > 0.8:
-            conclusion += f"静态偏心占比高达{features['static_ecc_ratio']:.2f}，几乎不存在动态偏心成分。"
-    elif ecc_type == "dynamic":
-        conclusion = f"电机存在{severity_text}动态偏心故障，特征指数为{severity:.2f}。动态偏心通常由转子旋转中心偏离几何中心引起，可能是转子弯曲、轴承磨损或转子动平衡问题导致。"
-        if features['dynamic_ecc_ratio'] > 0.8:
-            conclusion += f"动态偏心占比高达{features['dynamic_ecc_ratio']:.2f}，几乎不存在静态偏心成分。"
-    else:  # mixed
-        conclusion = f"电机存在{severity_text}混合偏心故障，特征指数为{severity:.2f}。检测到同时存在静态偏心({features['static_ecc_ratio']:.2f})和动态偏心({features['dynamic_ecc_ratio']:.2f})特征。"
-        conclusion += "混合偏心通常表明机械问题较为复杂，可能同时存在多种故障原因。"
+    conclusion = _CONCLUSION_TYPE_TEMPLATES[type_key].format(
+        severity_text=severity_text,
+        severity=severity,
+        static_ratio=features['static_ecc_ratio'],
+        dynamic_ratio=features['dynamic_ecc_ratio'],
+    )
     
-    if status == "warning":
-        conclusion += "该级别的偏心可能导致轻微振动增加、效率下降和寿命缩短，建议在计划维护时关注。"
-    elif status == "fault":
-        conclusion += "该级别的偏心会显著增加电机振动、噪声，降低效率，并可能导致定子-转子摩擦或轴承加速损坏，应尽快安排检修。"
+    dominant = _CONCLUSION_DOMINANT.get(type_key)
+    if dominant is not None and features[dominant[0]] > 0.8:
+        conclusion += dominant[1].format(ratio=features[dominant[0]])
+    
+    conclusion += _CONCLUSION_STATUS_SUFFIX.get(status, "")
     
     return conclusion
 
+# 建议措施表：正常状态的建议、各状态的通用建议、(状态, 偏心类型) 的针对性建议
+_NORMAL_SUGGESTIONS = (
+    "继续按照常规计划进行电机维护",
+    "保持良好的运行环境，避免过热和过载",
+    "定期进行状态监测，记录基准数据以便后续对比",
+)
+
+_MONITORING_SUGGESTION = "增加状态监测频率，关注偏心特征指标变化趋势"
+
+# 故障状态且严重程度超过0.8时追加
+_SPARE_MOTOR_SUGGESTION = "考虑准备备用电机，防止意外停机"
+
+_STATUS_SUGGESTIONS = {
+    "warning": "在下次计划停机时检查电机",
+    "fault": "尽快安排停机检修",
+}
+
+_TYPE_SUGGESTIONS = {
+    ("warning", "static"): (
+        "检查电机安装情况，确认底座和法兰是否平整",
+        "检查定子外壳是否变形或损坏",
+        "验证端盖和轴承座的同心度",
+        "考虑使用精密激光对中工具重新对中电机与负载",
+    ),
+    ("warning", "dynamic"): (
+        "检查转子是否弯曲或不平衡",
+        "检查轴承内外圈磨损情况",
+        "进行电机转子动平衡测试",
+        "检查联轴器磨损情况和偏差",
+    ),
+    ("warning", "mixed"): (
+        "全面检查电机机械系统，包括轴承、定子和转子",
+        "检查电机安装底座和联轴器",
+        "测量轴线偏移和转子动平衡情况",
+    ),
+    ("fault", "static"): (
+        "重新安装电机，确保完全对中",
+        "更换可能变形的底座或法兰",
+        "检查并修复定子铁芯变形问题",
+        "使用激光对中工具进行精确对中",
+    ),
+    ("fault", "dynamic"): (
+        "更换磨损的轴承",
+        "校正或更换弯曲的转轴",
+        "重新平衡转子",
+        "检查并修复可能的转子损伤",
+    ),
+    ("fault", "mixed"): (
+        "进行全面检修，可能需要拆解电机",
+        "更换磨损部件，特别是轴承和联轴器",
+        "重新对中并平衡电机系统",
+        "考虑电机是否需要返厂维修或更换",
+    ),
+}
+
 def generate_suggestions(status: str, ecc_type: str, severity: float) -> List[str]:
     """
     生成建议措施
@@ -373,67 +517,17 @@ def generate_suggestions(status: str, ecc_type: str, severity: float) -> List[st
     :param severity: 严重程度 (0-1)
     :return: 建议措施列表
     """
-    suggestions = []
-    
     if status == "normal":
-        suggestions = [
-            "继续按照常规计划进行电机维护",
-            "保持良好的运行环境，避免过热和过载",
-            "定期进行状态监测，记录基准数据以便后续对比"
-        ]
-        return suggestions
+        return list(_NORMAL_SUGGESTIONS)
     
     # 通用建议
-    suggestions.append("增加状态监测频率，关注偏心特征指标变化趋势")
+    suggestions = [_MONITORING_SUGGESTION]
     
-    if status == "warning":
-        suggestions.append("在下次计划停机时检查电机")
-        if ecc_type == "static":
-            suggestions.extend([
-                "检查电机安装情况，确认底座和法兰是否平整",
-                "检查定子外壳是否变形或损坏",
-                "验证端盖和轴承座的同心度",
-                "考虑使用精密激光对中工具重新对中电机与负载"
-            ])
-        elif ecc_type == "dynamic":
-            suggestions.extend([
-                "检查转子是否弯曲或不平衡",
-                "检查轴承内外圈磨损情况",
-                "进行电机转子动平衡测试",
-                "检查联轴器磨损情况和偏差"
-            ])
-        else:  # mixed
-            suggestions.extend([
-                "全面检查电机机械系统，包括轴承、定子和转子",
-                "检查电机安装底座和联轴器",
-                "测量轴线偏移和转子动平衡情况"
-            ])
-    
-    elif status == "fault":
-        suggestions.append("尽快安排停机检修")
-        if severity > 0.8:
-            suggestions.append("考虑准备备用电机，防止意外停机")
-        
-        if ecc_type == "static":
-            suggestions.extend([
-                "重新安装电机，确保完全对中",
-                "更换可能变形的底座或法兰",
-                "检查并修复定子铁芯变形问题",
-                "使用激光对中工具进行精确对中"
-            ])
-        elif ecc_type == "dynamic":
-            suggestions.extend([
-                "更换磨损的轴承",
-                "校正或更换弯曲的转轴",
-                "重新平衡转子",
-                "检查并修复可能的转子损伤"
-            ])
-        else:  # mixed
-            suggestions.extend([
-                "进行全面检修，可能需要拆解电机",
-                "更换磨损部件，特别是轴承和联轴器",
-                "重新对中并平衡电机系统",
-                "考虑电机是否需要返厂维修或更换"
-            ])
+    status_suggestion = _STATUS_SUGGESTIONS.get(status)
+    if status_suggestion is not None:
+        suggestions.append(status_suggestion)
+        if status == "fault" and severity > 0.8:
+            suggestions.append(_SPARE_MOTOR_SUGGESTION)
+        suggestions.extend(_TYPE_SUGGESTIONS[(status, _ecc_type_key(ecc_type))])
     
-    return suggestions 
\ No newline at end of file
+    return suggestions
@@ -3,7 +3,11 @@ import numpy as np
 from typing import Dict, Any
 import logging
 import math
-from scipy import stats
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +29,49 @@ THRESHOLDS = {
     "efficiency_drop": -0.03  # 效率下降阈值(比例)
 }
 
+# 参与评分的特征 (顺序与下面的斜率、权重一一对应；最后一项热老化累积按线性评分，其余按sigmoid评分)
+_SCORE_FEATURES = ("temp_ratio", "temp_rise_rate", "thermal_residual",
+                   "efficiency_residual", "current_residual_trend", "thermal_aging")
+# sigmoid评分的斜率，效率残差取负号表示效率低于阈值时得分升高
+_SIGMOID_SCALES = np.array([10.0, 2.0, 0.5, -30.0, 200.0])
+_SIGMOID_SCALES.setflags(write=False)
+# 热老化累积的满分值
+_THERMAL_AGING_FULL_SCALE = 1000.0
+# 各特征在综合评分中的权重
+_SCORE_WEIGHTS = {
+    "temp_ratio": 0.15,
+    "temp_rise_rate": 0.20,
+    "thermal_residual": 0.25,
+    "efficiency_residual": 0.15,
+    "current_residual_trend": 0.15,
+    "thermal_aging": 0.10
+}
+
+def _feature_scores_loop(values: np.ndarray, offsets: np.ndarray, scales: np.ndarray, aging_full_scale: float) -> np.ndarray:
+    """特征得分：前n-1项为 sigmoid((v - offset) * scale)（指数参数截断到±50），最后一项为线性的热老化得分"""
+    n = values.shape[0]
+    scores = np.empty(n)
+    for i in range(n - 1):
+        z = (values[i] - offsets[i]) * scales[i]
+        z = min(max(z, -50.0), 50.0)
+        scores[i] = 1.0 / (1.0 + math.exp(-z))
+    scores[n - 1] = min(1.0, values[n - 1] / aging_full_scale)
+    return scores
+
+def _weighted_score_loop(scores: np.ndarray, weights: np.ndarray) -> float:
+    """按权重归一化的加权平均分，截断到0~1"""
+    total_score = 0.0
+    total_weight = 0.0
+    for i in range(scores.shape[0]):
+        total_score += scores[i] * weights[i]
+        total_weight += weights[i]
+    health_score = total_score / total_weight if total_weight > 0 else 0.5
+    return min(max(health_score, 0.0), 1.0)
+
+# 可选依赖：安装了numba时编译评分内核，省去每次诊断的Python标量运算开销
+_feature_scores_kernel = njit(cache=True)(_feature_scores_loop) if njit is not None else _feature_scores_loop
+_weighted_score_kernel = njit(cache=True)(_weighted_score_loop) if njit is not None else _weighted_score_loop
+
 def analyze_insulation_health(df: pd.DataFrame) -> Dict[str, Any]:
     """
     分析电机绝缘健康状态
@@ -64,6 +111,13 @@ def analyze_insulation_health(df: pd.DataFrame) -> Dict[str, Any]:
         logger.exception("绝缘健康状态诊断失败")
         raise
 
+def _skipna_mean(values: np.ndarray) -> float:
+    """均值，与pandas一致地跳过缺失值 (无缺失时走普通均值)"""
+    mean = float(values.mean())
+    if math.isnan(mean):
+        mean = float(np.nanmean(values))
+    return mean
+
 def extract_insulation_features(df: pd.DataFrame) -> Dict[str, float]:
     """提取绝缘健康状态特征"""
     features = {}
@@ -90,18 +144,23 @@ def extract_insulation_features(df: pd.DataFrame) -> Dict[str, float]:
         
         # 1.2 温升速率
         if 'T_winding' in df.columns and len(df) > 5:
-            # 假设数据是按时间顺序排列的，计算温度变化率
-            # 如果有时间戳列，可以使用实际时间间隔
-            if 'timestamp' in df.columns:
-                df['time_diff'] = df['timestamp'].diff()
-                df['temp_diff'] = df['T_winding'].diff()
-                # 计算每分钟温升
-                df['temp_rise_rate'] = df['temp_diff'] / df['time_diff'] * 60
-                temp_rise_rate = df['temp_rise_rate'].mean()
+            # 假设数据是按时间顺序排列且等间隔采样，每分钟温升 = 首尾温差 / 首尾时间差 * 60，
+            # 与逐点变化率的均值相同，无需生成差分序列
+            # 如果有时间戳列，可以使用实际时间间隔，否则假设采样间隔为1秒
+            T_winding = df['T_winding']
+            has_timestamp = 'timestamp' in df.columns
+            time_span = df['timestamp'].iloc[-1] - df['timestamp'].iloc[0] if has_timestamp else len(df) - 1
+            if time_span > 0:
+                temp_rise_rate = (T_winding.iloc[-1] - T_winding.iloc[0]) / time_span * 60
             else:
-                # 如果没有时间戳，假设采样间隔为1秒
-                temp_diff = df['T_winding'].diff()
-                temp_rise_rate = temp_diff.mean() * 60  # 转换为每分钟
+                temp_rise_rate = np.nan
+            
+            if pd.isna(temp_rise_rate):
+                # 首尾温度或时间缺失时退回逐点变化率的均值
+                if has_timestamp:
+                    temp_rise_rate = (T_winding.diff() / df['timestamp'].diff() * 60).mean()
+                else:
+                    temp_rise_rate = T_winding.diff().mean() * 60
             
             # 确保值有效
             if pd.isna(temp_rise_rate) or math.isinf(temp_rise_rate):
@@ -112,12 +171,18 @@ def extract_insulation_features(df: pd.DataFrame) -> Dict[str, float]:
             temp_rise_rate = 0.5  # 默认值
             logger.info("无法计算温升速率，使用默认值: 0.5 °C/min")
         
+        # 三相电流逐点平方和 Ia²+Ib²+Ic² (温度模型和效率计算共用)
+        phase_sq_sum = None
+        if all(col in df.columns for col in ['Ia', 'Ib', 'Ic']):
+            phase_currents = df[['Ia', 'Ib', 'Ic']].to_numpy(dtype=np.float64)
+            phase_sq_sum = np.einsum('ij,ij->i', phase_currents, phase_currents)
+        
         # 1.3 温度模型残差
         # 简化的温度模型: T_model = k1 * I^2 + k2
         # 其中I是电流均方根值，k1和k2是系数
-        if all(col in df.columns for col in ['Ia', 'Ib', 'Ic', 'T_winding']):
+        if phase_sq_sum is not None and 'T_winding' in df.columns:
             # 计算电流均方根值
-            I_rms = np.sqrt((df['Ia']**2 + df['Ib']**2 + df['Ic']**2) / 3).mean()
+            I_rms = _skipna_mean(np.sqrt(phase_sq_sum / 3))
             
             # 简化模型系数（实际应基于历史数据校准）
             k1 = 0.5
@@ -143,7 +208,7 @@ def extract_insulation_features(df: pd.DataFrame) -> Dict[str, float]:
                 mech_power = df['Torque'].abs() * df['Speed'].abs() * 2 * np.pi / 60
                 
                 # 计算电功率
-                elec_power = (df['Ia']**2 + df['Ib']**2 + df['Ic']**2).mean() * df['Vdc'].mean()
+                elec_power = _skipna_mean(phase_sq_sum) * df['Vdc'].mean()
                 
                 # 计算实际效率
                 if elec_power > 0 and mech_power.mean() > 0:
@@ -170,28 +235,17 @@ def extract_insulation_features(df: pd.DataFrame) -> Dict[str, float]:
         # 3. 电流残差趋势
         # 这里使用简化方法，实际应分析长期数据
         if 'Id_actual' in df.columns and 'Iq_actual' in df.columns:
-            # 假设参考值为平均值
-            Id_ref = df['Id_actual'].mean()
-            Iq_ref = df['Iq_actual'].mean()
-            
-            # 计算残差
-            delta_Id = df['Id_actual'] - Id_ref
-            delta_Iq = df['Iq_actual'] - Iq_ref
-            
-            # 分析趋势（使用简单线性回归）
-            x = np.arange(len(df))
-            
-            # Id趋势
-            try:
-                Id_slope, _, _, _, _ = stats.linregress(x, delta_Id)
-            except:
-                Id_slope = 0
-                
-            # Iq趋势
-            try:
-                Iq_slope, _, _, _, _ = stats.linregress(x, delta_Iq)
-            except:
-                Iq_slope = 0
+            # 以平均值为参考值，分析残差的线性趋势 (最小二乘斜率)
+            # 斜率闭式解 slope = Σ(x-x̄)(y-ȳ) / Σ(x-x̄)²，由于Σ(x-x̄)=0，减去参考值不影响斜率；
+            # Id、Iq两路共享x的统计量，一次矩阵乘法得到两个斜率
+            x = np.arange(len(df), dtype=np.float64)
+            x -= x.mean()
+            denom = float(x @ x)
+            if denom > 0:
+                currents = df[['Id_actual', 'Iq_actual']].to_numpy(dtype=np.float64)
+                Id_slope, Iq_slope = (x @ currents) / denom
+            else:
+                Id_slope = Iq_slope = 0
             
             # 使用斜率的绝对值作为趋势指标
             current_residual_trend = max(abs(Id_slope), abs(Iq_slope)) * 1000
@@ -204,16 +258,19 @@ def extract_insulation_features(df: pd.DataFrame) -> Dict[str, float]:
         # 简化计算，实际应基于长期温度数据
         if 'T_winding' in df.columns:
             T_ref = 90  # 参考温度
-            k = 2  # 阿伦尼乌斯公式相关常数
             
-            # 计算每个时间点的老化因子
-            aging_factors = np.maximum(0, (df['T_winding'] - T_ref) ** k)
+            # 每个时间点的老化因子为 (T - T_ref)^2 (阿伦尼乌斯公式相关常数k=2)，
+            # 用点积一次完成平方和；含缺失值时退回到跳过NaN的求和
+            deviation = df['T_winding'].to_numpy(dtype=np.float64) - T_ref
+            aging_sum = float(np.dot(deviation, deviation))
+            if math.isnan(aging_sum):
+                aging_sum = float(np.nansum(deviation * deviation))
             
             # 假设每个数据点间隔为1分钟，转换为小时
             delta_t = 1/60
             
             # 累积老化
-            thermal_aging = aging_factors.sum() * delta_t
+            thermal_aging = aging_sum * delta_t
             
             # 归一化到0-1000范围
             thermal_aging = min(1000, thermal_aging)
@@ -252,32 +309,19 @@ def extract_insulation_features(df: pd.DataFrame) -> Dict[str, float]:
 def calculate_feature_scores(features: Dict[str, float]) -> Dict[str, float]:
     """计算各特征的异常得分"""
     try:
-        # 温度比率得分
-        temp_ratio_score = sigmoid((features["temp_ratio"] - THRESHOLDS["temp_ratio"]) * 10)
-        
-        # 温升速率得分
-        temp_rise_rate_score = sigmoid((features["temp_rise_rate"] - THRESHOLDS["temp_rise_rate"]) * 2)
-        
-        # 温度模型残差得分
-        thermal_residual_score = sigmoid((features["thermal_residual"] - THRESHOLDS["thermal_residual"]) * 0.5)
-        
-        # 效率残差得分 (负值表示效率下降)
-        efficiency_residual_score = sigmoid((THRESHOLDS["efficiency_drop"] - features["efficiency_residual"]) * 30)
-        
-        # 电流残差趋势得分
-        current_trend_score = sigmoid((features["current_residual_trend"] - 0.005) * 200)
-        
-        # 热老化累积得分
-        thermal_aging_score = min(1.0, features["thermal_aging"] / 1000)
+        # 温度比率、温升速率、温度模型残差、效率残差 (负值表示效率下降)、电流残差趋势按阈值平移后做sigmoid评分，
+        # 热老化累积按满分值线性评分；阈值可通过配置修改，因此每次调用时读取
+        values = np.array([features[key] for key in _SCORE_FEATURES], dtype=np.float64)
+        offsets = np.array([
+            THRESHOLDS["temp_ratio"],
+            THRESHOLDS["temp_rise_rate"],
+            THRESHOLDS["thermal_residual"],
+            THRESHOLDS["efficiency_drop"],
+            0.005
+        ])
+        scores = _feature_scores_kernel(values, offsets, _SIGMOID_SCALES, _THERMAL_AGING_FULL_SCALE)
         
-        return {
-            "temp_ratio": float(temp_ratio_score),
-            "temp_rise_rate": float(temp_rise_rate_score),
-            "thermal_residual": float(thermal_residual_score),
-            "efficiency_residual": float(efficiency_residual_score),
-            "current_residual_trend": float(current_trend_score),
-            "thermal_aging": float(thermal_aging_score)
-        }
+        return dict(zip(_SCORE_FEATURES, scores.tolist()))
     
     except Exception as e:
         logger.exception(f"计算特征得分失败: {str(e)}")
@@ -295,32 +339,12 @@ def calculate_feature_scores(features: Dict[str, float]) -> Dict[str, float]:
 def calculate_health_score(feature_scores: Dict[str, float]) -> float:
     """计算绝缘健康综合评分"""
     try:
-        # 各特征权重
-        weights = {
-            "temp_ratio": 0.15,
-            "temp_rise_rate": 0.20,
-            "thermal_residual": 0.25,
-            "efficiency_residual": 0.15,
-            "current_residual_trend": 0.15,
-            "thermal_aging": 0.10
-        }
-        
-        # 加权计算总分
-        total_score = 0
-        total_weight = 0
-        
-        for key, score in feature_scores.items():
-            if key in weights:
-                total_score += score * weights[key]
-                total_weight += weights[key]
-        
-        # 归一化得分
-        health_score = total_score / total_weight if total_weight > 0 else 0.5
-        
-        # 确保分数在0-1范围内
-        health_score = min(max(health_score, 0), 1)
+        # 只对有权重的特征加权，并按实际参与的权重之和归一化，结果截断到0~1
+        keys = [key for key in feature_scores if key in _SCORE_WEIGHTS]
+        scores = np.array([feature_scores[key] for key in keys], dtype=np.float64)
+        weights = np.array([_SCORE_WEIGHTS[key] for key in keys], dtype=np.float64)
         
-        return float(health_score)
+        return float(_weighted_score_kernel(scores, weights))
     
     except Exception as e:
         logger.exception("健康评分计算失败")
@@ -192,13 +192,14 @@ def _legacy_extract_features(df: pd.DataFrame) -> Dict[str, float]:
             # 检查数据点是否足够计算峭度
             if len(delta_iq) >= 4:  # 至少需要4个点才能计算峭度
                 # 计算峭度 = [平均(x-μ)^4] / [平均(x-μ)^2]^2 - 3
-                mean = delta_iq.mean()
-                diff_squared = (delta_iq - mean) ** 2
-                diff_fourth = (delta_iq - mean) ** 4
+                centered = delta_iq.to_numpy(dtype=np.float64) - delta_iq.mean()
+                diff_squared = centered * centered
+                diff_fourth = diff_squared * diff_squared
                 
-                variance_squared = (diff_squared.mean()) ** 2
+                variance = np.nanmean(diff_squared)
+                variance_squared = variance * variance
                 if variance_squared > 0:
-                    kurtosis_delta_iq = diff_fourth.mean() / variance_squared - 3
+                    kurtosis_delta_iq = np.nanmean(diff_fourth) / variance_squared - 3
                 else:
                     kurtosis_delta_iq = 0
             else:
@@ -3,6 +3,8 @@ import redis.asyncio as redis
 import json
 import logging
 import time
+from concurrent.futures import Executor
+from contextlib import nullcontext
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Callable
 from dataclasses import dataclass
@@ -41,9 +43,17 @@ class DiagnosisResult:
 class DistributedDiagnosisStream:
     """基于Redis Stream的分布式故障诊断系统"""
     
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    def __init__(self, redis_url: str = "redis://localhost:6379", redis_client: Optional[redis.Redis] = None,
+                 compute_executor: Optional[Executor] = None, max_concurrent_analyses: Optional[int] = None):
         self.redis_url = redis_url
-        self.redis_client = None
+        # 允许调用方注入已有客户端，与其共享连接池
+        self.redis_client = redis_client
+        
+        # 计算密集的分析器调用可交给执行器，Redis读写仍留在事件循环
+        self.compute_executor = compute_executor
+        self._analysis_semaphore = (
+            asyncio.Semaphore(max_concurrent_analyses) if max_concurrent_analyses else None
+        )
         
         # 流名称定义
         self.streams = {
@@ -88,12 +98,13 @@ class DistributedDiagnosisStream:
     async def connect(self):
         """连接Redis并初始化流和消费者组"""
         try:
-            self.redis_client = redis.from_url(
-                self.redis_url,
-                decode_responses=True,
-                retry_on_timeout=True,
-                health_check_interval=30
-            )
+            if self.redis_client is None:
+                self.redis_client = redis.from_url(
+                    self.redis_url,
+                    decode_responses=True,
+                    retry_on_timeout=True,
+                    health_check_interval=30
+                )
             await self.redis_client.ping()
             logger.info("✅ Redis连接成功")
             
@@ -243,7 +254,13 @@ class DistributedDiagnosisStream:
             start_time = time.time()
             
             # 调用对应的分析器
-            result = analyzer.analyze(sensor_data)
+            if self.compute_executor is None:
+                result = analyzer.analyze(sensor_data)
+            else:
+                async with self._analysis_semaphore or nullcontext():
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        self.compute_executor, analyzer.analyze, sensor_data
+                    )
             
             processing_time = time.time() - start_time
             
@@ -0,0 +1,10 @@
+"""
+测试公共配置：将 backend 加入导入路径，使测试可直接导入 app 包
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
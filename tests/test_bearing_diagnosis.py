@@ -0,0 +1,70 @@
+"""
+轴承故障诊断频谱与特征测试
+
+运行：python -m pytest tests/test_bearing_diagnosis.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.diagnosis.bearing_diagnosis import (
+    analyze_bearing_health,
+    calculate_amplitude_spectrum,
+    calculate_envelope_spectrum,
+    calculate_frequency_domain_features,
+)
+
+
+def reference_band_energies(data: np.ndarray, fs: float):
+    """原始实现：按原始点数的加窗rfft计算各频带能量比"""
+    n = len(data)
+    amplitude = 2 * np.abs(np.fft.rfft(data * np.hanning(n)) / n)
+    freqs = np.fft.rfftfreq(n, d=1 / fs)
+    power = amplitude ** 2
+    bands = [(0, 500), (500, 1000), (1000, 2000), (2000, 3000), (3000, fs / 2)]
+    return [power[(freqs >= lo) & (freqs <= hi)].sum() / power.sum() for lo, hi in bands]
+
+
+@pytest.mark.parametrize("n", [9973, 30001])
+def test_spectrum_features_use_the_unpadded_grid(n):
+    fs = 10000.0
+    x = np.random.default_rng(1).standard_normal(n)
+
+    freqs, amplitude = calculate_amplitude_spectrum(x, fs)
+    np.testing.assert_allclose(freqs, np.fft.rfftfreq(n, d=1 / fs))
+    assert amplitude.shape == (n // 2 + 1,)
+
+    features, _, _ = calculate_frequency_domain_features(x, fs)
+    band_ratios = [features[f"energy_band_{i}"] for i in range(1, 6)]
+    np.testing.assert_allclose(band_ratios, reference_band_energies(x, fs), rtol=1e-9)
+
+
+def test_envelope_spectrum_uses_the_unpadded_grid():
+    n, fs = 9973, 10000.0
+    x = np.random.default_rng(2).standard_normal(n)
+
+    freqs, amplitude = calculate_envelope_spectrum(x, fs)
+    resolution = fs / n
+    np.testing.assert_allclose(freqs, np.arange(len(freqs)) * resolution)
+    assert freqs[-1] <= 500 < freqs[-1] + resolution
+
+
+def test_multi_channel_input_keeps_the_single_channel_payload():
+    n, fs = 8192, 10000.0
+    rng = np.random.default_rng(3)
+    t = np.arange(n) / fs
+    single = pd.DataFrame({"time": t, "vibration_x": rng.standard_normal(n)})
+    multi = single.assign(vibration_y=rng.standard_normal(n), vibration_z=rng.standard_normal(n))
+
+    single_result = analyze_bearing_health(single)
+    multi_result = analyze_bearing_health(multi)
+    assert multi_result.keys() == single_result.keys()
+    assert multi_result["features"] == single_result["features"]
+
+
+def test_time_series_returns_the_original_samples():
+    n, fs = 4096, 10000.0
+    x = np.round(np.random.default_rng(4).standard_normal(n), 3)
+    result = analyze_bearing_health(pd.DataFrame({"time": np.arange(n) / fs, "vibration_x": x}))
+    assert result["time_series"]["values"] == x[::n // 1000].tolist()
@@ -0,0 +1,59 @@
+"""
+断条故障诊断频谱与特征测试
+
+运行：python -m pytest tests/test_broken_bar_diagnosis.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.diagnosis.broken_bar_diagnosis import analyze_broken_bar_health, calculate_spectrum
+
+
+def make_current(n: int, fs: float = 10000.0, seed: int = 0) -> pd.DataFrame:
+    """50Hz基波 + 3、5次谐波 + 转差率2%的断条边带 + 噪声"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / fs
+    x = (5.0 * np.sin(2 * np.pi * 50 * t)
+         + 0.25 * np.sin(2 * np.pi * 150 * t) + 0.1 * np.sin(2 * np.pi * 250 * t)
+         + 0.4 * np.sin(2 * np.pi * 48 * t) + 0.3 * np.sin(2 * np.pi * 52 * t)
+         + 0.05 * rng.standard_normal(n))
+    return pd.DataFrame({"Ia": x, "timestamp": t, "Speed": np.full(n, 1470.0)})
+
+
+def reference_features(x: np.ndarray, fs: float):
+    """原始实现：float64、按原始点数计算频谱，取50Hz最近频点为基波"""
+    n = len(x)
+    x = x - x.mean()
+    amp = 2.0 / n * np.abs(np.fft.fft(x * np.hanning(n))[:n // 2])
+    freq = np.fft.fftfreq(n, 1 / fs)[:n // 2]
+    k = int(np.argmin(np.abs(freq - 50.0)))
+    thd = np.sqrt(sum(amp[h * k] ** 2 for h in range(2, 11) if h * k < len(amp))) / amp[k]
+    return amp[k], thd
+
+
+@pytest.mark.parametrize("n", [20000, 30001])
+def test_spectrum_keeps_the_unpadded_frequency_grid(n):
+    freq, amp = calculate_spectrum(np.zeros(n, dtype=np.float32), 10000.0)
+    np.testing.assert_allclose(freq, np.fft.rfftfreq(n, 1 / 10000.0)[:n // 2])
+    assert amp.shape == (n // 2,)
+
+
+@pytest.mark.parametrize("n", [20000, 30001])
+def test_fundamental_and_thd_match_float64_reference(n):
+    df = make_current(n)
+    features = analyze_broken_bar_health(df)["features"]
+
+    fundamental, thd = reference_features(df["Ia"].to_numpy(), 10000.0)
+    # 单精度频谱只影响约第6位有效数字；补零到快速FFT长度曾使基波幅值偏移约1%、THD 偏移约10%
+    assert features["fundamental_amp"] == pytest.approx(fundamental, rel=1e-4)
+    assert features["current_thd"] == pytest.approx(thd, rel=1e-3)
+
+
+def test_time_series_is_the_original_centred_signal():
+    df = make_current(8191)
+    result = analyze_broken_bar_health(df)
+
+    x = df["Ia"].to_numpy()
+    assert result["time_series"]["values"] == (x[:500] - x.mean()).tolist()
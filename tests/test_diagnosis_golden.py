@@ -0,0 +1,113 @@
+"""
+诊断算法黄金值测试：在 data/samples 下的样例数据上运行各诊断算法，
+与原始实现(优化前)的输出比对，防止性能优化改变诊断结果
+
+运行：python -m pytest tests/test_diagnosis_golden.py
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from app.services.diagnosis import (
+    analyze_bearing_health,
+    analyze_broken_bar_health,
+    analyze_eccentricity_health,
+)
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "samples")
+
+# 单精度频谱路径只影响约第6位有效数字
+REL_TOL = 1e-4
+ABS_TOL = 1e-5
+
+_NO_BEARING_FAULT = {"inner_race": 0.0, "outer_race": 0.0, "ball": 0.0, "cage": 0.0, "normal": 1.0}
+
+BEARING_GOLDEN = {
+    "bearing_ball_sample.csv": {
+        "rms": 0.36565831, "peak": 0.48, "kurtosis": -1.8720439, "crest_factor": 1.3127009,
+        "freq_mean": 177.31526, "freq_rms": 0.91865554, "energy_band_1": 1.0,
+    },
+    "bearing_inner_race_sample.csv": {
+        "rms": 0.0024494897, "peak": 0.004, "kurtosis": -1.0333333, "crest_factor": 1.6329932,
+        "freq_mean": 44.476248, "freq_rms": 0.85922817, "energy_band_1": 1.0,
+    },
+    "bearing_normal_sample.csv": {
+        "rms": 0.0028722813, "peak": 0.0045, "kurtosis": -1.2242424, "crest_factor": 1.5666989,
+        "freq_mean": 44.550243, "freq_rms": 0.13250602, "energy_band_1": 1.0,
+    },
+    "bearing_outer_race_sample.csv": {
+        "rms": 0.0028722813, "peak": 0.0045, "kurtosis": -1.2242424, "crest_factor": 1.5666989,
+        "freq_mean": 44.526873, "freq_rms": 0.34034959, "energy_band_1": 1.0,
+    },
+}
+
+BROKEN_BAR_GOLDEN = {
+    "broken_bar_broken_bar_sample.csv": {
+        "fundamental_amp": 1.0058906, "sideband_ratio": 1.0, "broken_bar_count": 5, "current_thd": 0.035527083,
+        "slip": 0.001, "current_rms": 1.5718588,
+    },
+    "broken_bar_normal_sample.csv": {
+        "fundamental_amp": 0.9921868, "sideband_ratio": 1.0, "broken_bar_count": 5, "current_thd": 0.035603282,
+        "slip": 0.001, "current_rms": 1.5444679,
+    },
+}
+
+ECCENTRICITY_GOLDEN = {
+    "eccentricity_dynamic_sample.csv": {
+        "sideband_k1": 12.904106, "sideband_k2": 1.3067357, "sideband_k3": 1.2839912, "eccentricity_index": 7.930555,
+        "static_ratio": 1.9351904, "dynamic_ratio": -0.93519042, "current_rms": 4.4944328, "current_thd": 0.17460501,
+    },
+    "eccentricity_mixed_sample.csv": {
+        "sideband_k1": 23.472331, "sideband_k2": 2.3198785, "sideband_k3": 2.232791, "eccentricity_index": 14.394553,
+        "static_ratio": 1.9326042, "dynamic_ratio": -0.93260425, "current_rms": 4.8739451, "current_thd": 0.35339969,
+    },
+    "eccentricity_normal_sample.csv": {
+        "sideband_k1": 13.182839, "sideband_k2": 1.0606436, "sideband_k3": 1.0643282, "eccentricity_index": 7.988139,
+        "static_ratio": 1.9317146, "dynamic_ratio": -0.93171459, "current_rms": 4.5287685, "current_thd": 0.1809681,
+    },
+    "eccentricity_static_sample.csv": {
+        "sideband_k1": 17.360196, "sideband_k2": 1.2986797, "sideband_k3": 1.2078452, "eccentricity_index": 10.463712,
+        "static_ratio": 1.920792, "dynamic_ratio": -0.92079204, "current_rms": 4.7745909, "current_thd": 0.3650775,
+    },
+}
+
+
+def load_sample(name: str) -> pd.DataFrame:
+    return pd.read_csv(os.path.join(SAMPLES_DIR, name))
+
+
+def assert_features(actual: dict, expected: dict):
+    for key, value in expected.items():
+        assert actual[key] == pytest.approx(value, rel=REL_TOL, abs=ABS_TOL), key
+
+
+@pytest.mark.parametrize("name", sorted(BEARING_GOLDEN))
+def test_bearing_samples(name):
+    result = analyze_bearing_health(load_sample(name))
+
+    assert result["status"] == "normal"
+    assert result["fault_type"] == "inner_race"
+    assert result["score"] == pytest.approx(0.0, abs=ABS_TOL)
+    assert result["fault_probabilities"] == pytest.approx(_NO_BEARING_FAULT, abs=ABS_TOL)
+    assert_features(result["features"], BEARING_GOLDEN[name])
+
+
+@pytest.mark.parametrize("name", sorted(BROKEN_BAR_GOLDEN))
+def test_broken_bar_samples(name):
+    result = analyze_broken_bar_health(load_sample(name))
+
+    assert result["status"] == "fault"
+    assert result["score"] == pytest.approx(1.0)
+    assert_features(result["features"], BROKEN_BAR_GOLDEN[name])
+
+
+@pytest.mark.parametrize("name", sorted(ECCENTRICITY_GOLDEN))
+def test_eccentricity_samples(name):
+    result = analyze_eccentricity_health(load_sample(name))
+
+    assert result["status"] == "fault"
+    assert result["eccentricity_type"] == "static"
+    assert result["score"] == pytest.approx(1.0)
+    assert_features(result["features"], ECCENTRICITY_GOLDEN[name])
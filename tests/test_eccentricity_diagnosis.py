@@ -0,0 +1,83 @@
+"""
+偏心故障诊断频谱计算测试
+
+运行：python -m pytest tests/test_eccentricity_diagnosis.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.diagnosis.eccentricity_diagnosis import (
+    _nearest_bin,
+    _nearest_bins,
+    analyze_eccentricity_health,
+    calculate_spectrum,
+)
+
+
+def make_eccentric_currents(n: int, fs: float = 1000.0, ecc: float = 0.2, asym: float = 0.1, seed: int = 2) -> pd.DataFrame:
+    """三相电流：基波50Hz + 偏心边带 f_s ± k*f_r (上下边带按 asym 不对称) + 三次谐波 + 噪声"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / fs
+    f_rotor = 1470 / 60.0
+    data = {"timestamp": t}
+    for p, col in enumerate(("Ia", "Ib", "Ic")):
+        ph = 2 * np.pi * p / 3
+        x = 10 * np.sin(2 * np.pi * 50 * t + ph)
+        for k, w in ((1, 1.0), (2, 0.5), (3, 0.25)):
+            x += ecc * 10 * w * (1 + asym) * np.sin(2 * np.pi * (50 - k * f_rotor) * t + ph)
+            x += ecc * 10 * w * (1 - asym) * np.sin(2 * np.pi * (50 + k * f_rotor) * t + ph)
+        data[col] = x + 0.4 * np.sin(2 * np.pi * 150 * t) + 0.1 * rng.standard_normal(n)
+    data["Speed"] = 1470 + rng.standard_normal(n)
+    return pd.DataFrame(data)
+
+
+@pytest.mark.parametrize("n", [8191, 30001])
+def test_spectrum_keeps_the_unpadded_frequency_grid(n):
+    x = np.random.default_rng(0).standard_normal(n)
+    freq, amp = calculate_spectrum(x, 1000.0)
+
+    expected = 2.0 / n * np.abs(np.fft.rfft(x * np.hanning(n))[:n // 2])
+    np.testing.assert_allclose(freq, np.fft.rfftfreq(n, 1 / 1000.0)[:n // 2])
+    np.testing.assert_allclose(amp, expected, rtol=1e-9, atol=1e-12)
+
+
+def test_classification_on_awkward_length_is_not_shifted_by_padding():
+    # 30001 = 19 * 1579：补零到快速FFT长度时边带落到不同频点，曾把混合偏心误判为动态偏心
+    result = analyze_eccentricity_health(make_eccentric_currents(30001))
+
+    assert result["eccentricity_type"] == "mixed"
+    assert result["features"]["static_ratio"] == pytest.approx(0.3281, abs=1e-3)
+    assert result["features"]["eccentricity_index"] == pytest.approx(0.1460, abs=1e-3)
+
+
+def test_nearest_bin_matches_argmin_including_midpoint_ties():
+    # 100点@1kHz时频率分辨率为10Hz，1500rpm 的上边带 75Hz 恰在 70/80Hz 正中
+    freq, _ = calculate_spectrum(np.zeros(100), 1000.0)
+    targets = np.array([0.0, 24.9, 25.0, 50.0, 75.0, 100.0, 125.0, 499.0, 900.0])
+
+    expected = [int(np.argmin(np.abs(freq - t))) for t in targets]
+    assert _nearest_bins(freq, targets).tolist() == expected
+    assert [_nearest_bin(freq, t) for t in targets] == expected
+
+
+def test_spectrum_payload_is_full_by_default_and_band_limited_on_request():
+    n = 20000
+    df = make_eccentric_currents(n)
+
+    full = analyze_eccentricity_health(df)
+    assert len(full["frequency_spectrum"]["frequency"]) == n // 2
+    assert len(full["envelope_spectrum"]["amplitude"]) == n // 2
+
+    limited = analyze_eccentricity_health(df, spectrum_max_harmonic=5)
+    for key in ("frequency_spectrum", "envelope_spectrum"):
+        assert limited[key]["frequency"][-1] <= 250.0
+        assert len(limited[key]["frequency"]) == len(limited[key]["amplitude"]) == 5001
+    assert limited["features"] == full["features"]
+
+
+def test_time_series_returns_the_original_samples():
+    df = make_eccentric_currents(5000)
+    result = analyze_eccentricity_health(df)
+    assert result["time_series"]["values"] == df["Ia"].to_numpy()[:100].tolist()
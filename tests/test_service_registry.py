@@ -0,0 +1,337 @@
+"""
+服务注册表单元测试（基于 fakeredis，无需真实 Redis）
+
+运行：python -m pytest tests/test_service_registry.py
+"""
+
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest_asyncio = pytest.importorskip("pytest_asyncio")
+
+from app.services.cluster.service_registry import (
+    ServiceClient,
+    ServiceInfo,
+    ServiceRegistry,
+    ServiceStatus,
+    ServiceType,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_service(service_id: str, capabilities=("turn_fault",), **metadata) -> ServiceInfo:
+    return ServiceInfo(
+        service_id=service_id,
+        service_type=ServiceType.WORKER,
+        service_name=f"worker-{service_id}",
+        host="127.0.0.1",
+        port=9000,
+        status=ServiceStatus.STARTING,
+        capabilities=list(capabilities),
+        metadata=dict(metadata),
+        last_heartbeat=0.0,
+        registered_at=0.0,
+    )
+
+
+@pytest_asyncio.fixture
+async def redis_client():
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    yield client
+    await client.flushall()
+    await client.close()
+
+
+@pytest_asyncio.fixture
+async def registry(redis_client):
+    return ServiceRegistry(redis_client)
+
+
+async def test_find_service_prefers_lower_reported_load(registry, redis_client):
+    busy = ServiceClient(registry, make_service("busy"))
+    idle = ServiceClient(registry, make_service("idle"))
+    assert await registry.register_service(busy.service_info)
+    assert await registry.register_service(idle.service_info)
+
+    # 负载随元数据更新写入（与工作节点负载报告同一路径）
+    for client, load in ((busy, 8), (idle, 1)):
+        pipe = redis_client.pipeline(transaction=False)
+        client.update_metadata_cmd(pipe, {"current_load": load})
+        await pipe.execute()
+
+    assert await redis_client.zscore("vtox:load:turn_fault", "busy") == 8
+    found = await registry.find_service_for_capability("turn_fault")
+    assert found.service_id == "idle"
+
+    # 负载反转后选择随之改变
+    pipe = redis_client.pipeline(transaction=False)
+    idle.update_metadata_cmd(pipe, {"current_load": 20})
+    await pipe.execute()
+    found = await registry.find_service_for_capability("turn_fault")
+    assert found.service_id == "busy"
+
+
+
+class _ConfigRecorder:
+    """只实现 CONFIG GET/SET 的客户端替身（fakeredis 不支持 CONFIG 命令），返回 bytes 模拟未解码客户端"""
+
+    def __init__(self, flags: str):
+        self.flags = flags
+        self.config_set_calls = []
+
+    def register_script(self, script):
+        return None
+
+    async def config_get(self, name):
+        return {name.encode(): self.flags.encode()}
+
+    async def config_set(self, name, value):
+        self.config_set_calls.append((name, value))
+        self.flags = value
+
+
+async def test_expiry_notifications_are_only_configured_when_opted_in():
+    client = _ConfigRecorder("")
+    await ServiceRegistry(client)._enable_expiry_notifications()
+    assert client.config_set_calls == []
+
+    await ServiceRegistry(client, configure_keyspace_events=True)._enable_expiry_notifications()
+    assert client.config_set_calls == [("notify-keyspace-events", "Ex")]
+
+    # 已开启时不再修改
+    client.flags = "AKE"
+    client.config_set_calls.clear()
+    await ServiceRegistry(client, configure_keyspace_events=True)._enable_expiry_notifications()
+    assert client.config_set_calls == []
+
+
+async def test_batched_heartbeat_is_flushed_by_timer(registry, redis_client):
+    assert await registry.touch_heartbeat("svc")
+    assert 0 < await redis_client.ttl("vtox:hb:svc") <= registry.health_timeout
+    assert not registry._batch_flush_tasks
+
+
+async def test_stop_flushes_pending_batch(registry, redis_client):
+    registry.batch_flush_delay = 60
+    pending = asyncio.create_task(registry.touch_heartbeat("svc"))
+    await asyncio.sleep(0)
+    assert not pending.done()
+
+    await registry.stop_health_monitoring()
+    assert await asyncio.wait_for(pending, 1)
+    assert registry._batch_flush_handle is None
+    assert await redis_client.exists("vtox:hb:svc")
+
+
+async def test_startup_backfills_indexes_for_legacy_services(registry, redis_client):
+    # 模拟索引引入前写入的服务：只有哈希，没有索引
+    legacy = make_service("legacy", capabilities=("turn_fault", "insulation"), current_load=3)
+    legacy.status = ServiceStatus.HEALTHY
+    await redis_client.hset("vtox:services", "legacy", legacy.serialized())
+    assert await registry.get_services(capabilities=["insulation"]) == []
+
+    await registry._backfill_indexes()
+
+    found = await registry.get_services(service_type=ServiceType.WORKER, status=ServiceStatus.HEALTHY)
+    assert [s.service_id for s in found] == ["legacy"]
+    assert [s.service_id for s in await registry.get_services(capabilities=["insulation"])] == ["legacy"]
+    assert await redis_client.zscore("vtox:load:turn_fault", "legacy") == 3
+    assert (await registry.find_service_for_capability("insulation")).service_id == "legacy"
+
+
+async def test_mutations_refresh_cached_serialization(registry, redis_client):
+    service = make_service("svc")
+    stale = service.serialized()
+    assert await registry.register_service(service)
+
+    stored = await registry.get_service("svc")
+    assert service.serialized() != stale
+    assert stored.status == ServiceStatus.HEALTHY
+    assert stored.registered_at == service.registered_at
+
+    client = ServiceClient(registry, service)
+    pipe = redis_client.pipeline(transaction=False)
+    client.update_metadata_cmd(pipe, {"current_load": 2})
+    await pipe.execute()
+    assert (await registry.get_service("svc")).metadata["current_load"] == 2
+
+
+async def test_register_and_deregister_maintain_index_sets(registry, redis_client):
+    service = make_service("svc", capabilities=("turn_fault", "insulation"), current_load=4)
+    assert await registry.register_service(service)
+
+    assert await redis_client.smembers("vtox:idx:type:worker") == {"svc"}
+    assert await redis_client.smembers("vtox:idx:cap:turn_fault") == {"svc"}
+    assert await redis_client.smembers("vtox:idx:cap:insulation") == {"svc"}
+    assert await redis_client.smembers("vtox:idx:status:healthy") == {"svc"}
+    assert await redis_client.zscore("vtox:load:insulation", "svc") == 4
+
+    assert await registry.deregister_service("svc")
+    for key in ("vtox:idx:type:worker", "vtox:idx:cap:turn_fault",
+                "vtox:idx:cap:insulation", "vtox:idx:status:healthy"):
+        assert not await redis_client.exists(key)
+    assert await redis_client.zscore("vtox:load:turn_fault", "svc") is None
+    assert await registry.get_services() == []
+
+
+async def test_expired_heartbeat_marks_service_unhealthy(registry, redis_client):
+    registry.health_timeout = 1
+    assert await registry.register_service(make_service("svc"))
+    assert await registry.heartbeat("svc")
+    assert 0 < await redis_client.ttl("vtox:hb:svc") <= 1
+
+    # 心跳键存活期间巡检不改变状态
+    await registry._check_service_health()
+    assert (await registry.get_service("svc")).status == ServiceStatus.HEALTHY
+
+    await asyncio.sleep(1.1)
+    assert not await redis_client.exists("vtox:hb:svc")
+    # 巡检对注册不足30秒的服务保持宽限，这里模拟较早注册的服务
+    await registry._check_service_health()
+    assert (await registry.get_service("svc")).status == ServiceStatus.HEALTHY
+
+    stored = await registry.get_service("svc")
+    stored.registered_at -= 60
+    stored.invalidate_cache()
+    await redis_client.hset("vtox:services", "svc", stored.serialized())
+    await registry._check_service_health()
+
+    assert (await registry.get_service("svc")).status == ServiceStatus.UNHEALTHY
+    assert await redis_client.smembers("vtox:idx:status:unhealthy") == {"svc"}
+    assert not await redis_client.exists("vtox:idx:status:healthy")
+
+    # 恢复心跳后重新标记为健康
+    assert await registry.heartbeat("svc")
+    assert (await registry.get_service("svc")).status == ServiceStatus.HEALTHY
+    assert await redis_client.smembers("vtox:idx:status:healthy") == {"svc"}
+
+
+async def test_heartbeat_expiry_event_marks_service_unhealthy(registry, redis_client):
+    assert await registry.register_service(make_service("svc"))
+    await registry._on_heartbeat_expired("svc")
+    assert (await registry.get_service("svc")).status == ServiceStatus.UNHEALTHY
+    assert await redis_client.smembers("vtox:idx:status:unhealthy") == {"svc"}
+
+    # 未注册的服务忽略
+    await registry._on_heartbeat_expired("missing")
+    assert await registry.get_service("missing") is None
+
+
+async def test_lifecycle_events_are_written_to_stream(registry):
+    received = []
+    registry.add_event_listener("service_registered", received.append)
+
+    assert await registry.register_service(make_service("svc"))
+    await registry._on_heartbeat_expired("svc")
+    assert await registry.deregister_service("svc")
+    await registry._drain_events()
+
+    events = await registry.read_events(last_id="0", block_ms=10)
+    assert [e["event_type"] for e in events] == [
+        "service_registered", "service_unhealthy", "service_deregistered"
+    ]
+    assert all(e["service_data"]["service_id"] == "svc" for e in events)
+    assert events[-1]["service_data"]["status"] == ServiceStatus.SHUTDOWN.value
+
+    # 续读：最后一个事件之后没有新事件
+    assert await registry.read_events(last_id=events[-1]["event_id"], block_ms=10) == []
+
+    await asyncio.sleep(0.05)
+    assert [d["service_id"] for d in received] == ["svc"]
+
+
+async def test_find_service_pages_past_unhealthy_low_load_services(registry, redis_client):
+    registry.load_lookup_window = 2
+    for index in range(5):
+        assert await registry.register_service(make_service(f"svc{index}", current_load=index))
+    # 负载最低的三个服务不健康，需翻页到第二个窗口之后
+    for index in range(3):
+        await registry._on_heartbeat_expired(f"svc{index}")
+
+    assert (await registry.find_service_for_capability("turn_fault")).service_id == "svc3"
+    assert (await registry.find_service_for_capability("turn_fault", prefer_healthy=False)).service_id == "svc0"
+
+    # 全部不健康时选择负载最低的服务
+    for index in range(3, 5):
+        await registry._on_heartbeat_expired(f"svc{index}")
+    assert (await registry.find_service_for_capability("turn_fault")).service_id == "svc0"
+    assert await registry.find_service_for_capability("unknown") is None
+
+
+async def test_metadata_report_keeps_registry_owned_status(registry, redis_client):
+    service = make_service("svc", current_load=1)
+    assert await registry.register_service(service)
+    client = ServiceClient(registry, service)
+    await registry._on_heartbeat_expired("svc")
+
+    # 工作节点本地仍认为自己健康，上报只更新元数据和负载，不恢复状态
+    pipe = redis_client.pipeline(transaction=False)
+    client.update_metadata_cmd(pipe, {"current_load": 5, "cpu_usage": 12.5})
+    await pipe.execute()
+
+    stored = await registry.get_service("svc")
+    assert stored.status == ServiceStatus.UNHEALTHY
+    assert stored.metadata["cpu_usage"] == 12.5
+    assert await redis_client.zscore("vtox:load:turn_fault", "svc") == 5
+    assert await redis_client.smembers("vtox:idx:status:unhealthy") == {"svc"}
+    assert not await redis_client.exists("vtox:idx:status:healthy")
+
+    # 注销后的迟到上报不会重建服务及索引
+    assert await registry.deregister_service("svc")
+    pipe = redis_client.pipeline(transaction=False)
+    client.update_metadata_cmd(pipe, {"current_load": 7})
+    await pipe.execute()
+    assert await registry.get_service("svc") is None
+    assert await redis_client.zscore("vtox:load:turn_fault", "svc") is None
+    assert await registry.get_services() == []
+
+
+async def test_batch_round_trip_does_not_block_new_commands(registry, redis_client):
+    registry.batch_max_commands = 1
+    release = asyncio.Event()
+    make_pipeline = redis_client.pipeline
+
+    def slow_pipeline(*args, **kwargs):
+        pipe = make_pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def slow_execute(*a, **kw):
+            await release.wait()
+            return await execute(*a, **kw)
+
+        pipe.execute = slow_execute
+        return pipe
+
+    # 第一批的Redis往返被挂起
+    redis_client.pipeline = slow_pipeline
+    first = asyncio.create_task(registry.touch_heartbeat("slow"))
+    await asyncio.sleep(0)
+    assert not first.done()
+
+    # 第一批仍在等待往返时，新命令进入新管道并独立发送
+    redis_client.pipeline = make_pipeline
+    assert await asyncio.wait_for(registry.touch_heartbeat("fast"), 1)
+    assert not first.done()
+
+    release.set()
+    assert await asyncio.wait_for(first, 1)
+    assert await redis_client.exists("vtox:hb:slow", "vtox:hb:fast") == 2
+
+
+async def test_health_leader_lock_fails_over_within_renew_ttl(redis_client):
+    leader, standby = ServiceRegistry(redis_client), ServiceRegistry(redis_client)
+    for registry in (leader, standby):
+        registry.health_leader_renew_interval = 0.1
+
+    assert await leader._acquire_health_leader()
+    assert not await standby._acquire_health_leader()
+    # 锁TTL按续期间隔计算，与兜底巡检间隔无关
+    assert 0 < await redis_client.pttl("vtox:health_leader") <= 300
+
+    # 主节点停止续期（崩溃）后，备用节点在锁TTL内接管
+    await asyncio.sleep(0.35)
+    assert await standby._acquire_health_leader()
+    assert not await leader._acquire_health_leader()